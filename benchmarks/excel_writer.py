@@ -0,0 +1,50 @@
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from engine import LeaderboardEngine  # noqa: E402
+from synthetic import make_leaderboard  # noqa: E402
+
+
+def run(fast_excel, df, directory, memory=False):
+    app = LeaderboardEngine(directory, use_cache=False, use_store=False, fast_excel=fast_excel)
+    filepath = Path(directory) / f'{"fast" if fast_excel else "legacy"}.xlsx'
+
+    start = time.perf_counter()
+    app.write_excel_file(filepath, [('Sheet1', df)])
+    elapsed = time.perf_counter() - start
+
+    # tracemalloc slows the writers down a lot, so measure memory in a second run
+    peak = None
+    if memory:
+        tracemalloc.start()
+        app.write_excel_file(filepath, [('Sheet1', df)])
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return elapsed, peak, filepath.stat().st_size
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the fast and legacy Excel writers')
+    parser.add_argument('--cells', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--skip-legacy', action='store_true', help='only time the fast writer')
+    parser.add_argument('--memory', action='store_true', help='also measure peak traced memory')
+    args = parser.parse_args()
+
+    print(f'{"cells":>10} {"writer":>8} {"seconds":>9} {"peak MiB":>9} {"file KiB":>9}')
+    with tempfile.TemporaryDirectory() as directory:
+        for cells in args.cells:
+            df = make_leaderboard(cells)
+            for fast_excel in ([True] if args.skip_legacy else [True, False]):
+                elapsed, peak, size = run(fast_excel, df, directory, args.memory)
+                peak = '-' if peak is None else f'{peak / 2 ** 20:.1f}'
+                print(f'{cells:>10} {"fast" if fast_excel else "legacy":>8} {elapsed:>9.2f} '
+                      f'{peak:>9} {size / 2 ** 10:>9.0f}')
+
+
+if __name__ == '__main__':
+    main()
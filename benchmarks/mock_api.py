@@ -0,0 +1,139 @@
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+class LeaderboardHandler(BaseHTTPRequestHandler):
+    # Serves /rest/contests/{id}/leaderboard?offset=&limit= like HackerRank does
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_body(self, status, body=b'', headers=()):
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        url = urlsplit(self.path)
+        parts = url.path.strip('/').split('/')
+        server.count_request()
+
+        if server.latency:
+            time.sleep(server.latency)
+        if len(parts) != 4 or parts[:2] != ['rest', 'contests'] or parts[3] != 'leaderboard':
+            return self.send_body(404)
+        if server.error_rate and server.rng.random() < server.error_rate:
+            return self.send_body(503)
+
+        query = parse_qs(url.query)
+        try:
+            offset = int(query.get('offset', ['0'])[0])
+            limit = int(query.get('limit', ['100'])[0])
+        except ValueError:
+            return self.send_body(400)
+        limit = min(limit, server.max_limit)
+
+        rows = server.contest(parts[2])
+        body = json.dumps({'models': rows[offset:offset + limit], 'total': len(rows)}).encode()
+        self.send_body(200, body, [('Content-Type', 'application/json')])
+
+
+class MockLeaderboardServer(ThreadingHTTPServer):
+    # A local stand-in for the HackerRank leaderboard API. Every contest has
+    # `participants` rows drawn from a shared pool of handles (hacker_0, hacker_1, ...),
+    # so the same handles show up across contests and in synthetic student batches.
+    daemon_threads = True
+
+    def __init__(self, participants=1000, latency=0.0, error_rate=0.0, max_limit=1000, seed=0,
+                 host='127.0.0.1', port=0):
+        super().__init__((host, port), LeaderboardHandler)
+        self.participants = participants
+        self.latency = latency
+        self.error_rate = error_rate
+        self.max_limit = max_limit
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.contests = {}
+        self.requests = 0
+        self.lock = threading.Lock()
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    @staticmethod
+    def pool_size(participants):
+        return participants + participants // 4
+
+    def contest(self, contest_id):
+        with self.lock:
+            if contest_id not in self.contests:
+                self.contests[contest_id] = self.make_contest(contest_id)
+            return self.contests[contest_id]
+
+    def make_contest(self, contest_id):
+        rng = random.Random(f'{self.seed}-{contest_id}')
+        handles = rng.sample(range(self.pool_size(self.participants)), self.participants)
+        scores = sorted((float(rng.randint(0, 100)) for _ in handles), reverse=True)
+        return [{'rank': rank, 'hacker': f'hacker_{handle}', 'score': score, 'time_taken': rng.randint(1, 10000)}
+                for rank, (handle, score) in enumerate(zip(handles, scores), 1)]
+
+    def count_request(self):
+        with self.lock:
+            self.requests += 1
+
+    def reset(self):
+        with self.lock:
+            self.requests = 0
+
+    def start(self):
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve synthetic contest leaderboards on a local port')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--participants', type=int, default=1000, help='rows per contest')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every request')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests answered with 503')
+    parser.add_argument('--max-limit', type=int, default=1000, help='largest page the server returns')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    server = MockLeaderboardServer(args.participants, args.latency, args.error_rate, args.max_limit, args.seed,
+                                   port=args.port)
+    print(f'Serving on {server.url} (pass --base-url {server.url} to main.py generate)')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
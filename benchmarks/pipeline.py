@@ -0,0 +1,156 @@
+import argparse
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import engine  # noqa: E402
+from engine import LeaderboardEngine  # noqa: E402
+from mock_api import MockLeaderboardServer  # noqa: E402
+from synthetic import write_students  # noqa: E402
+
+STAGES = ['fetch', 'generate', 'combine', 'write', 'write-legacy']
+
+
+def measure(func, server, memory=False):
+    # Returns (seconds, requests served, peak traced bytes or None, rows processed)
+    server.reset()
+    start = time.perf_counter()
+    rows = func()
+    elapsed = time.perf_counter() - start
+    requests = server.requests
+
+    # tracemalloc slows everything down a lot, so measure memory in a second run
+    peak = None
+    if memory:
+        tracemalloc.start()
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return elapsed, requests, peak, rows
+
+
+class Pipeline:
+    # The GUI stages, driven against a MockLeaderboardServer in a scratch directory
+    def __init__(self, args, server, directory):
+        self.args = args
+        self.server = server
+        self.directory = Path(directory)
+        self.contest_ids = [f'contest-{i}' for i in range(args.contests)]
+        self.leaderboard_file = self.directory / 'TotalHackerrankLeaderBoard.xlsx'
+        self.student_file = self.directory / 'StudentBatch.xlsx'
+        self.leaderboard = None
+        self.app = self.make_engine()
+
+    def make_engine(self, fast_excel=True):
+        app = LeaderboardEngine(self.directory, base_url=self.server.url, max_workers=self.args.workers,
+                                page_size=self.args.page_size, use_cache=False, use_store=False,
+                                fast_excel=fast_excel)
+        app.client.rate_limit = self.args.rate_limit
+        return app
+
+    def fetch(self):
+        results, errors = self.app.fetch_contests(self.contest_ids)
+        if errors:
+            raise RuntimeError(f'fetch failed: {errors}')
+        return sum(len(df) for df in results.values())
+
+    def generate(self):
+        rows = []
+        report = self.app.generate(
+            self.contest_ids,
+            on_event=lambda event: rows.append(event['rows']) if event['type'] == 'contest_fetched' else None
+        )
+        if report['errors']:
+            raise RuntimeError(f"generate failed: {report['errors']}")
+        return sum(rows)
+
+    def combine(self):
+        if not self.student_file.exists():
+            write_students(self.student_file, self.args.students, self.server.pool_size(self.args.participants),
+                           self.args.match_rate)
+        self.app.combine(self.student_file, self.leaderboard_file)
+        return self.args.students
+
+    def write(self, fast_excel=True):
+        name = 'write' if fast_excel else 'write-legacy'
+        writer = self.make_engine(fast_excel)
+        writer.write_excel_file(self.directory / f'{name}.xlsx', [('Sheet1', self.leaderboard)])
+        return len(self.leaderboard)
+
+    def run(self, stages):
+        for stage in STAGES:
+            if stage not in stages:
+                continue
+            # Later stages read the total leaderboard, so make sure there is one
+            if stage not in ('fetch', 'generate') and not self.leaderboard_file.exists():
+                self.generate()
+            # The writers are timed on their own, without reading the workbook back
+            if stage.startswith('write') and self.leaderboard is None:
+                self.leaderboard = pd.read_excel(self.leaderboard_file)
+
+            func = {
+                'fetch': self.fetch,
+                'generate': self.generate,
+                'combine': self.combine,
+                'write': self.write,
+                'write-legacy': lambda: self.write(fast_excel=False),
+            }[stage]
+            elapsed, requests, peak, rows = measure(func, self.server, self.args.memory)
+            yield {
+                'stage': stage,
+                'seconds': elapsed,
+                'requests': requests,
+                'requests_per_second': requests / elapsed if elapsed else 0.0,
+                'rows': rows,
+                'rows_per_second': rows / elapsed if elapsed else 0.0,
+                'peak_bytes': peak,
+            }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Time the fetch, generate, combine and write stages against a local mock of the HackerRank API'
+    )
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES[:-1],
+                        help='stages to run (default: all but write-legacy)')
+    parser.add_argument('--contests', type=int, default=5)
+    parser.add_argument('--participants', type=int, default=5_000, help='rows per contest')
+    parser.add_argument('--students', type=int, default=5_000, help='rows in the synthetic student batch')
+    parser.add_argument('--match-rate', type=float, default=0.8,
+                        help='fraction of students that appear on the leaderboard')
+    parser.add_argument('--latency', type=float, default=0.02, help='seconds the mock server adds per request')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests answered with 503')
+    parser.add_argument('--max-limit', type=int, default=engine.MAX_PAGE_SIZE,
+                        help='largest page the mock server returns')
+    parser.add_argument('--workers', type=int, default=engine.MAX_WORKERS)
+    parser.add_argument('--page-size', type=int, default=engine.MAX_PAGE_SIZE)
+    parser.add_argument('--rate-limit', type=float, default=engine.RATE_LIMIT,
+                        help='client requests per second (default: %(default)s)')
+    parser.add_argument('--memory', action='store_true', help='also measure peak traced memory')
+    parser.add_argument('--json', help='also write the results to this file')
+    args = parser.parse_args()
+
+    server = MockLeaderboardServer(args.participants, args.latency, args.error_rate, args.max_limit)
+    results = []
+    print(f'{"stage":>12} {"seconds":>9} {"requests":>9} {"req/s":>8} {"rows":>9} {"rows/s":>10} {"peak MiB":>9}')
+    with server, tempfile.TemporaryDirectory() as directory:
+        for result in Pipeline(args, server, directory).run(args.stages):
+            results.append(result)
+            peak = '-' if result['peak_bytes'] is None else f"{result['peak_bytes'] / 2 ** 20:.1f}"
+            print(f"{result['stage']:>12} {result['seconds']:>9.2f} {result['requests']:>9} "
+                  f"{result['requests_per_second']:>8.1f} {result['rows']:>9} {result['rows_per_second']:>10.0f} "
+                  f"{peak:>9}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'options': vars(args), 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from engine import LeaderboardEngine  # noqa: E402
+
+
+def make_leaderboard(cells, contests=3, seed=0):
+    # Rank, Name, one column per contest and Total Score
+    rng = np.random.default_rng(seed)
+    rows = max(1, cells // (contests + 3))
+    df = pd.DataFrame({'Rank': range(1, rows + 1), 'Name': [f'hacker_{i}' for i in range(rows)]})
+    for contest in range(contests):
+        df[f'contest-{contest}'] = rng.integers(0, 100, rows).astype(float)
+    df['Total Score'] = df.iloc[:, 2:].sum(axis=1)
+    return df
+
+
+def make_students(students, participants, match_rate=0.8, seed=0):
+    # Roll number and Hackerrank columns. About match_rate of the handles are
+    # leaderboard names, written the way students type them (@, case, spaces).
+    rng = np.random.default_rng(seed)
+    matched = rng.random(students) < match_rate
+    handles = np.where(matched,
+                       np.char.add('hacker_', rng.integers(0, max(1, participants), students).astype(str)),
+                       np.char.add('student_', np.arange(students).astype(str)))
+    handles = pd.Series(handles)
+    styles = rng.integers(0, 4, students)
+    handles = handles.where(styles != 1, '@' + handles)
+    handles = handles.where(styles != 2, handles.str.upper())
+    handles = handles.where(styles != 3, ' ' + handles + ' ')
+    return pd.DataFrame({'Roll number': [f'R{i:06d}' for i in range(students)], 'Hackerrank': handles})
+
+
+def write_leaderboard(filepath, participants, contests=3, seed=0):
+    # Written with the same styling as TotalHackerrankLeaderBoard.xlsx
+    df = make_leaderboard(participants * (contests + 3), contests, seed)
+    app = LeaderboardEngine(Path(filepath).parent, use_cache=False, use_store=False)
+    app.write_excel_file(filepath, [('Sheet1', df)])
+    return filepath
+
+
+def write_students(filepath, students, participants, match_rate=0.8, seed=0):
+    make_students(students, participants, match_rate, seed).to_excel(filepath, index=False)
+    return filepath
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Write a synthetic leaderboard and student batch')
+    parser.add_argument('--output-dir', default='.', help='directory for the workbooks (default: %(default)s)')
+    parser.add_argument('--participants', type=int, default=10_000, help='leaderboard rows')
+    parser.add_argument('--contests', type=int, default=3)
+    parser.add_argument('--students', type=int, default=5_000, help='student batch rows')
+    parser.add_argument('--match-rate', type=float, default=0.8,
+                        help='fraction of students that appear on the leaderboard')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    print(write_leaderboard(output_dir / 'TotalHackerrankLeaderBoard.xlsx', args.participants, args.contests,
+                            args.seed))
+    print(write_students(output_dir / 'StudentBatch.xlsx', args.students, args.participants, args.match_rate,
+                         args.seed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,1681 @@
+import cProfile
+import hashlib
+import io
+import itertools
+import json
+import math
+import os
+import pstats
+import random
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager
+from difflib import SequenceMatcher
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+import pandas as pd
+import numpy as np
+import zipfile
+import zlib
+from array import array
+from operator import itemgetter
+import xlsxwriter
+import openpyxl
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+import requests
+from requests.adapters import HTTPAdapter
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from urllib.parse import quote, urlsplit
+from pathlib import Path
+
+try:
+    import pyarrow.feather as feather
+except ImportError:  # the Feather sidecar is optional
+    feather = None
+
+try:
+    import orjson
+except ImportError:  # orjson only speeds up page parsing; json is used without it
+    orjson = None
+
+
+BASE_URL = 'https://www.hackerrank.com'
+HEADERS = {
+    "User-agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/47.0.2526.80 "
+                  "Safari/537.36"
+}
+PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+CHUNK_ROWS = 10000
+MAX_WORKERS = 8
+RENDER_WORKERS = os.cpu_count() or 1
+PARALLEL_RENDER_ROWS = 50000  # below this, starting worker processes costs more than it saves
+MAX_RETRIES = 5
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30
+RETRY_AFTER_MAX = 10 * 60  # longest Retry-After the client waits out
+RATE_LIMIT = 10  # requests per second, per host
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+OUTPUT_DIR = 'Leaderboards'
+CACHE_FILE = 'cache.sqlite3'
+CACHE_TTL = 15 * 60  # seconds before a cached page is revalidated
+CACHE_MAX_BYTES = 256 * 1024 * 1024
+STORE_FILE = 'contests.sqlite3'
+ALIAS_FILE = 'aliases.sqlite3'
+SHEETS_DIR = 'sheets'
+PROFILE_MODES = ('cprofile', 'tracemalloc')
+SIDECAR_SUFFIX = '.feather'
+ROSTER_COLUMNS = ['Roll number', 'Hackerrank']
+WATCH_INTERVAL = 10  # seconds between polls in watch mode
+# Leaderboard columns that can be kept from a page: JSON field and array typecode (None keeps a list)
+PAGE_FIELDS = {'Name': ('hacker', None), 'Score': ('score', 'd'), 'Rank': ('rank', 'q'), 'Time': ('time_taken', 'd')}
+PAGE_COLUMNS = ('Name', 'Score')
+FUZZY_THRESHOLD = 0.85  # lowest similarity accepted for a fuzzy handle match
+FUZZY_MARGIN = 0.05  # how much better than the runner-up a fuzzy match must be
+FUZZY_CANDIDATES = 20  # handles compared in full per lookup
+FUZZY_MAX_POSTINGS = 1000  # trigrams shared by more handles than this are not used to find candidates
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                self.refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+
+    def pause(self, seconds):
+        # Hold back every caller on this host until the pause has elapsed
+        with self.lock:
+            self.refill()
+            self.tokens = min(self.tokens, 1 - seconds * self.rate)
+
+
+class RunMetrics:
+    # Wall time per stage and counters for one run. Stages and counters may be
+    # updated from worker threads; time spent in a stage on several threads at once adds up.
+    def __init__(self, profile=None, profile_mode='cprofile', profile_path=None):
+        self.started_at = datetime.now(timezone.utc)
+        self.stages = {}
+        self.counters = {}
+        self.lock = threading.Lock()
+        self.active = threading.local()
+
+        # One stage can be run under cProfile or tracemalloc
+        self.profile = profile
+        self.profile_mode = profile_mode
+        self.profile_path = profile_path
+        self.profiler = None
+        self.peak_memory = 0
+        self.snapshot = None
+
+    def count(self, name, value=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    @contextmanager
+    def stage(self, name):
+        # A stage entered again from inside itself is only timed once
+        active = self.active.__dict__.setdefault('stages', set())
+        if name in active:
+            yield
+            return
+
+        active.add(name)
+        profiling = name == self.profile
+        if profiling:
+            self.start_profile()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            if profiling:
+                self.stop_profile()
+            active.discard(name)
+            with self.lock:
+                self.stages[name] = self.stages.get(name, 0.0) + elapsed
+
+    def start_profile(self):
+        if self.profile_mode == 'tracemalloc':
+            tracemalloc.start()
+        else:
+            self.profiler = self.profiler or cProfile.Profile()
+            self.profiler.enable()
+
+    def stop_profile(self):
+        if self.profile_mode == 'tracemalloc':
+            peak = tracemalloc.get_traced_memory()[1]
+            if peak >= self.peak_memory:
+                self.peak_memory = peak
+                self.snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+        else:
+            self.profiler.disable()
+
+    def profile_report(self, limit=20):
+        # Summary of the profiled stage. cProfile only sees the thread that runs
+        # the stage, not the page downloads on the worker threads.
+        if self.profile_mode == 'tracemalloc':
+            if self.snapshot is None:
+                return None
+            return {
+                'stage': self.profile,
+                'mode': self.profile_mode,
+                'peak_bytes': self.peak_memory,
+                'top': [str(stat) for stat in self.snapshot.statistics('lineno')[:limit]],
+            }
+
+        if self.profiler is None:
+            return None
+        if self.profile_path:
+            self.profiler.dump_stats(str(self.profile_path))
+        text = io.StringIO()
+        pstats.Stats(self.profiler, stream=text).sort_stats('cumulative').print_stats(limit)
+        return {
+            'stage': self.profile,
+            'mode': self.profile_mode,
+            'file': str(self.profile_path) if self.profile_path else None,
+            'stats': text.getvalue(),
+        }
+
+    def report(self, **extra):
+        with self.lock:
+            report = {
+                'started_at': self.started_at.isoformat(),
+                'seconds': (datetime.now(timezone.utc) - self.started_at).total_seconds(),
+                'stages': dict(self.stages),
+                'counters': dict(self.counters),
+            }
+        if self.profile:
+            report['profile'] = self.profile_report()
+        report.update(extra)
+        return report
+
+    def write_json(self, path, **extra):
+        with open(path, 'w') as f:
+            json.dump(self.report(**extra), f, indent=2, default=str)
+
+    def prometheus(self):
+        # Prometheus text exposition format
+        with self.lock:
+            stages = sorted(self.stages.items())
+            counters = sorted(self.counters.items())
+        lines = [
+            '# HELP hackerrank_stage_seconds Wall time spent in each stage of the run.',
+            '# TYPE hackerrank_stage_seconds gauge',
+        ]
+        lines += [f'hackerrank_stage_seconds{{stage="{name}"}} {seconds:.6f}' for name, seconds in stages]
+        for name, value in counters:
+            lines += [f'# TYPE hackerrank_{name}_total counter', f'hackerrank_{name}_total {value}']
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path):
+        with open(path, 'w') as f:
+            f.write(self.prometheus())
+
+
+class LeaderboardClient:
+    def __init__(self, pool_size=MAX_WORKERS, max_retries=MAX_RETRIES, rate_limit=RATE_LIMIT, timeout=10,
+                 metrics=None):
+        self.metrics = metrics or RunMetrics()
+        self.max_retries = max_retries
+        self.rate_limit = rate_limit
+        self.timeout = timeout
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+        # One keep-alive connection pool shared by every worker thread
+        self.session = requests.Session()
+        self.session.headers.update(HEADERS)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def bucket(self, host):
+        with self.lock:
+            if host not in self.buckets:
+                self.buckets[host] = TokenBucket(self.rate_limit, self.rate_limit)
+            return self.buckets[host]
+
+    @staticmethod
+    def backoff(attempt):
+        # Exponential backoff with full jitter
+        return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+    @staticmethod
+    def retry_after(response):
+        value = response.headers.get('Retry-After')
+        if not value:
+            return None
+        try:
+            seconds = float(value)
+        except ValueError:
+            try:
+                seconds = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+            except (TypeError, ValueError):
+                return None
+        return min(RETRY_AFTER_MAX, max(0.0, seconds))
+
+    def get(self, url, **kwargs):
+        bucket = self.bucket(urlsplit(url).netloc)
+        for attempt in range(self.max_retries + 1):
+            bucket.acquire()
+            if attempt:
+                self.metrics.count('retries')
+            self.metrics.count('requests')
+            try:
+                response = self.session.get(url, timeout=self.timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.max_retries:
+                    raise
+                delay = self.backoff(attempt)
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                    response.raise_for_status()
+                    return response
+                delay = self.retry_after(response)
+                if delay is None:
+                    delay = self.backoff(attempt)
+                if response.status_code == 429:
+                    self.metrics.count('throttled')
+                    bucket.pause(delay)
+            time.sleep(delay)
+
+
+class LeaderboardCache:
+    def __init__(self, path=Path(OUTPUT_DIR) / CACHE_FILE, ttl=CACHE_TTL, max_bytes=CACHE_MAX_BYTES):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS pages (
+                contest TEXT, offset INTEGER, page_size INTEGER,
+                body BLOB, size INTEGER, etag TEXT, last_modified TEXT,
+                expires_at REAL, accessed_at REAL,
+                PRIMARY KEY (contest, offset, page_size)
+            )''')
+        self.conn.execute('CREATE TABLE IF NOT EXISTS final_contests (contest TEXT PRIMARY KEY)')
+        self.conn.commit()
+
+    def get(self, contest, offset, page_size):
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT body, etag, last_modified, expires_at FROM pages '
+                'WHERE contest = ? AND offset = ? AND page_size = ?',
+                (contest, offset, page_size)).fetchone()
+            if row is None:
+                return None
+            self.conn.execute(
+                'UPDATE pages SET accessed_at = ? WHERE contest = ? AND offset = ? AND page_size = ?',
+                (time.time(), contest, offset, page_size))
+            self.conn.commit()
+
+        body, etag, last_modified, expires_at = row
+        return {
+            'body': zlib.decompress(body),
+            'etag': etag,
+            'last_modified': last_modified,
+            'fresh': expires_at is None or expires_at > time.time(),
+        }
+
+    def put(self, contest, offset, page_size, body, etag=None, last_modified=None, ttl=None):
+        body = zlib.compress(body)
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (contest, offset, page_size, body, len(body), etag, last_modified,
+                 now + (self.ttl if ttl is None else ttl), now))
+            self.conn.commit()
+
+    def touch(self, contest, offset, page_size, ttl=None):
+        # The server confirmed the cached page is still current
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                'UPDATE pages SET expires_at = ?, accessed_at = ? WHERE contest = ? AND offset = ? AND page_size = ?',
+                (now + (self.ttl if ttl is None else ttl), now, contest, offset, page_size))
+            self.conn.commit()
+
+    def is_final(self, contest):
+        with self.lock:
+            return self.conn.execute(
+                'SELECT 1 FROM final_contests WHERE contest = ?', (contest,)).fetchone() is not None
+
+    def mark_final(self, contest, final=True):
+        with self.lock:
+            if final:
+                self.conn.execute('INSERT OR IGNORE INTO final_contests VALUES (?)', (contest,))
+            else:
+                self.conn.execute('DELETE FROM final_contests WHERE contest = ?', (contest,))
+            self.conn.commit()
+
+    def evict(self):
+        # Drop least recently used pages until the cache fits in max_bytes.
+        # Pages of final contests are only evicted once nothing else is left.
+        with self.lock:
+            total = self.conn.execute('SELECT COALESCE(SUM(size), 0) FROM pages').fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            rows = self.conn.execute(
+                'SELECT rowid, size FROM pages '
+                'ORDER BY contest IN (SELECT contest FROM final_contests), accessed_at').fetchall()
+            stale = []
+            for rowid, size in rows:
+                if total <= self.max_bytes:
+                    break
+                stale.append((rowid,))
+                total -= size
+            self.conn.executemany('DELETE FROM pages WHERE rowid = ?', stale)
+            self.conn.commit()
+
+
+class ContestStore:
+    def __init__(self, path=Path(OUTPUT_DIR) / STORE_FILE, ttl=CACHE_TTL):
+        self.ttl = ttl
+        self.lock = threading.Lock()
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS contests (
+                contest TEXT PRIMARY KEY, fetched_at REAL, digest TEXT, score_dtype TEXT
+            )''')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS scores (
+                contest TEXT, position INTEGER, name TEXT, score REAL,
+                PRIMARY KEY (contest, position)
+            )''')
+        self.conn.commit()
+
+    @staticmethod
+    def digest(df):
+        return hashlib.sha1(pd.util.hash_pandas_object(df, index=False).values).hexdigest()
+
+    def is_fresh(self, contest, final=False):
+        with self.lock:
+            row = self.conn.execute('SELECT fetched_at FROM contests WHERE contest = ?', (contest,)).fetchone()
+        return row is not None and (final or row[0] + self.ttl > time.time())
+
+    def get_digest(self, contest):
+        with self.lock:
+            row = self.conn.execute('SELECT digest FROM contests WHERE contest = ?', (contest,)).fetchone()
+        return row[0] if row else None
+
+    def load(self, contest):
+        with self.lock:
+            row = self.conn.execute('SELECT score_dtype FROM contests WHERE contest = ?', (contest,)).fetchone()
+            if row is None:
+                return None
+            df = pd.read_sql_query('SELECT name AS Name, score AS Score FROM scores WHERE contest = ? ORDER BY position',
+                                   self.conn, params=(contest,))
+        return df.astype({'Score': row[0]})
+
+    def save(self, contest, df):
+        # Only rewrite the rows when the contest actually changed
+        digest = self.digest(df)
+        with self.lock:
+            row = self.conn.execute('SELECT digest FROM contests WHERE contest = ?', (contest,)).fetchone()
+            if row is None or row[0] != digest:
+                self.conn.execute('DELETE FROM scores WHERE contest = ?', (contest,))
+                self.conn.executemany('INSERT INTO scores VALUES (?, ?, ?, ?)',
+                                      zip([contest] * len(df), range(len(df)),
+                                          df['Name'].tolist(), df['Score'].tolist()))
+            self.conn.execute('INSERT OR REPLACE INTO contests VALUES (?, ?, ?, ?)',
+                              (contest, time.time(), digest, str(df['Score'].dtype)))
+            self.conn.commit()
+        return digest
+
+
+class AliasTable:
+    # Handles known to belong to a roll number, kept across runs. Imported
+    # entries are 'manual' and combine adds its 'exact' matches. Fuzzy matches
+    # are never stored: they stay suggestions, flagged in every run.
+    def __init__(self, path=Path(OUTPUT_DIR) / ALIAS_FILE):
+        self.lock = threading.Lock()
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS aliases (
+                roll_number TEXT, handle TEXT, source TEXT, confidence REAL, added_at REAL,
+                PRIMARY KEY (roll_number, handle)
+            )''')
+        self.conn.commit()
+
+    def add(self, roll_numbers, handles, source):
+        # Rows without a roll number or handle are skipped. An exact match never
+        # replaces an entry that is already there.
+        now = time.time()
+        rows = [(str(roll_number), handle, source, 1.0, now)
+                for roll_number, handle in zip(roll_numbers, handles)
+                if pd.notna(roll_number) and pd.notna(handle) and handle]
+        verb = 'INSERT OR REPLACE' if source == 'manual' else 'INSERT OR IGNORE'
+        with self.lock:
+            self.conn.executemany(f'{verb} INTO aliases VALUES (?, ?, ?, ?, ?)', rows)
+            self.conn.commit()
+        return len(rows)
+
+    def lookup(self, roll_numbers):
+        # roll number -> known handles, manual entries first, then the newest
+        roll_numbers = list(dict.fromkeys(str(roll_number) for roll_number in roll_numbers if pd.notna(roll_number)))
+        known = defaultdict(list)
+        with self.lock:
+            for start in range(0, len(roll_numbers), 500):
+                chunk = roll_numbers[start:start + 500]
+                rows = self.conn.execute(
+                    f'''SELECT roll_number, handle FROM aliases
+                        WHERE source IN ('manual', 'exact') AND roll_number IN ({', '.join('?' * len(chunk))})
+                        ORDER BY source != 'manual', added_at DESC''', chunk)
+                for roll_number, handle in rows:
+                    known[roll_number].append(handle)
+        return known
+
+
+class HandleIndex:
+    # Trigram index over leaderboard handles for fuzzy lookups. A lookup only
+    # compares the handles sharing the most trigrams with the query; trigrams
+    # that most handles share say little and are left out of the index.
+    def __init__(self, handles):
+        self.handles = list(handles)
+        self.keys = [self.key(handle) for handle in self.handles]
+        postings = defaultdict(list)
+        for number, key in enumerate(self.keys):
+            for gram in self.grams(key):
+                postings[gram].append(number)
+        self.postings = {gram: np.array(numbers) for gram, numbers in postings.items()
+                         if len(numbers) <= FUZZY_MAX_POSTINGS}
+
+    @staticmethod
+    def key(handle):
+        # Dots, dashes, underscores and other stray characters are ignored
+        return re.sub(r'[^0-9a-z]', '', str(handle).lower())
+
+    @staticmethod
+    def digitless(key):
+        return re.sub(r'[0-9]', '', key)
+
+    @staticmethod
+    def grams(key):
+        padded = f'^{key}$'
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    def lookup(self, handle, threshold=0.0):
+        # [(similarity, handle number)] of the closest handles at least threshold similar, best first
+        key = self.key(handle)
+        postings = [self.postings[gram] for gram in self.grams(key) if gram in self.postings]
+        if not key or not postings:
+            return []
+        numbers, shared = np.unique(np.concatenate(postings), return_counts=True)
+        candidates = numbers[np.argsort(-shared, kind='stable')[:FUZZY_CANDIDATES]]
+        scores = []
+        for number in candidates.tolist():
+            # Numbered handles (cse21_045, cse21_046) are different people, not typos
+            if self.keys[number] != key and self.digitless(self.keys[number]) == self.digitless(key):
+                continue
+            # The quick ratios are upper bounds of ratio() and much cheaper
+            matcher = SequenceMatcher(None, key, self.keys[number])
+            if matcher.real_quick_ratio() >= threshold and matcher.quick_ratio() >= threshold:
+                similarity = matcher.ratio()
+                if similarity >= threshold:
+                    scores.append((similarity, number))
+        return sorted(scores, key=lambda score: -score[0])
+
+
+class ScoreStore:
+    # Scores of several contests in one contest x participant matrix. Handles are
+    # interned to participant numbers in first-seen order, and a participant who
+    # missed a contest scores 0 in it.
+    def __init__(self, contests, capacity=1024):
+        self.contests = list(dict.fromkeys(contests))
+        self.positions = {name: position for position, name in enumerate(self.contests)}
+        self.ids = defaultdict(itertools.count().__next__)  # handle -> participant number, numbered on first sight
+        self.scores = np.zeros((len(self.contests), capacity))
+        self.float_contests = set()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def intern(self, handles):
+        # Participant numbers for the handles, registering new ones
+        numbers = np.fromiter(map(self.ids.__getitem__, handles), dtype='int64', count=len(handles))
+        if len(self) > self.scores.shape[1]:
+            grown = np.zeros((len(self.contests), max(len(self), 2 * self.scores.shape[1])))
+            grown[:, :self.scores.shape[1]] = self.scores
+            self.scores = grown
+        return numbers
+
+    def add_contest(self, contest, handles, scores):
+        # Adding a contest again replaces its scores
+        ids = self.intern(handles)
+        if pd.api.types.is_integer_dtype(scores):
+            self.float_contests.discard(contest)
+        else:
+            self.float_contests.add(contest)
+
+        # A handle listed twice in one contest keeps its last score
+        last = ~pd.Series(ids).duplicated(keep='last').to_numpy()
+        row = self.scores[self.positions[contest]]
+        row[:] = 0
+        row[ids[last]] = np.asarray(scores, dtype=float)[last]
+
+    def update_scores(self, contest, handles, scores):
+        # Set the scores of some participants in one contest and leave the rest
+        # alone. Returns their participant numbers.
+        ids = self.intern(handles)
+        if not pd.api.types.is_integer_dtype(scores):
+            self.float_contests.add(contest)
+        self.scores[self.positions[contest], ids] = np.asarray(scores, dtype=float)
+        return ids
+
+    def totals(self):
+        return self.scores[:, :len(self)].sum(axis=0)
+
+    def ranks(self):
+        # 1 for the highest total, ties in first-seen order so they keep their places between updates
+        order = pd.Series(self.totals()).sort_values(ascending=False, kind='stable').index.to_numpy()
+        ranks = np.empty(len(order), dtype='int64')
+        ranks[order] = np.arange(1, len(order) + 1)
+        return ranks
+
+    def to_frame(self):
+        # Name, one column per contest and Total Score. Contests without float
+        # scores, including those never added, get integer columns.
+        df = pd.DataFrame(self.scores[:, :len(self)].T, columns=self.contests)
+        integer_columns = [name for name in self.contests if name not in self.float_contests]
+        if integer_columns:
+            df[integer_columns] = df[integer_columns].astype('int64')
+
+        # Add Total Score column
+        df['Total Score'] = df.sum(axis=1)
+        df.insert(0, 'Name', list(self.ids))
+        return df
+
+
+class LeaderboardEngine:
+    def __init__(self, output_dir=OUTPUT_DIR, base_url=BASE_URL, max_workers=MAX_WORKERS, page_size=MAX_PAGE_SIZE,
+                 use_cache=True, use_store=True, fast_excel=True, metrics=None, render_workers=RENDER_WORKERS):
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.base_url = base_url
+        self.max_workers = max_workers
+        self.page_size = page_size
+        self.fast_excel = fast_excel
+        self.render_workers = render_workers
+        self.metrics = metrics or RunMetrics()
+        self.client = LeaderboardClient(pool_size=max_workers, metrics=self.metrics)
+        self.cache = LeaderboardCache(self.output_dir / CACHE_FILE) if use_cache else None
+        self.store = ContestStore(self.output_dir / STORE_FILE) if use_store else None
+        self.aliases = None  # opened on first use, see alias_table
+        self.on_event = None
+
+    def emit(self, event_type, **fields):
+        # Events may come from worker threads, so on_event must be thread-safe
+        # (queue.Queue.put, for example)
+        if self.on_event:
+            self.on_event({'type': event_type, **fields})
+
+    def generateExcelSheet(self, name, df):
+        # This method now only handles the total leaderboard
+        if name != 'TotalHackerrankLeaderBoard':
+            return
+
+        # Sort the DataFrame
+        df = df.sort_values(by='Total Score', ascending=False)
+
+        # Add rank after sorting
+        df.insert(0, 'Rank', range(1, len(df) + 1))
+
+        # Create Excel file
+        filepath = self.output_dir / f'{name}.xlsx'
+        self.write_excel_file(filepath, [('Sheet1', df)])
+        self.write_sidecar(filepath, df)
+        return filepath
+
+    def write_sidecar(self, filepath, df):
+        # Keep a Feather copy of the data next to the workbook for combine to read
+        # instead of parsing the xlsx. Uncompressed, so it can be memory-mapped.
+        if feather is None:
+            return None
+        sidecar = Path(filepath).with_suffix(SIDECAR_SUFFIX)
+        with self.metrics.stage('write.sidecar'):
+            feather.write_feather(df.reset_index(drop=True), str(sidecar), compression='uncompressed')
+        self.metrics.count('bytes_written', sidecar.stat().st_size)
+        return sidecar
+
+    def read_leaderboard(self, filepath):
+        # Read a leaderboard from its sidecar when there is one that is at least
+        # as new as the workbook, so a workbook edited by hand still wins
+        filepath = Path(filepath)
+        sidecar = filepath if filepath.suffix == SIDECAR_SUFFIX else filepath.with_suffix(SIDECAR_SUFFIX)
+        if feather is not None and sidecar.exists() and (
+                sidecar == filepath or not filepath.exists() or sidecar.stat().st_mtime >= filepath.stat().st_mtime):
+            try:
+                df = feather.read_table(str(sidecar), memory_map=True).to_pandas()
+            except (OSError, ValueError):
+                if sidecar == filepath:
+                    raise
+            else:
+                self.metrics.count('sidecar_reads')
+                return df
+        return pd.read_excel(filepath)
+
+    def write_excel_file(self, filepath, sheets):
+        # sheets is an iterable of (sheet_name, df) pairs, consumed one at a time
+        self.write_excel_sheets(filepath, sheets)
+        self.metrics.count('bytes_written', Path(filepath).stat().st_size)
+
+    def write_excel_sheets(self, filepath, sheets):
+        # write_excel_file without counting the file in bytes_written, for the
+        # single-sheet pieces that are merged into a workbook
+        with self.metrics.stage('write'):
+            if not self.fast_excel:
+                with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
+                    for sheet_name, df in sheets:
+                        df.to_excel(writer, index=False, sheet_name=sheet_name)
+                        with self.metrics.stage('write.styling'):
+                            self.apply_excel_formatting(writer.sheets[sheet_name], df)
+                        self.metrics.count('sheets_written')
+                        self.metrics.count('rows_written', len(df))
+            else:
+                # Stream rows straight to disk, styling each row with shared formats
+                workbook = xlsxwriter.Workbook(str(filepath), {
+                    'constant_memory': True,
+                    'strings_to_formulas': False,
+                    'strings_to_urls': False,
+                })
+                formats = self.add_excel_formats(workbook)
+                try:
+                    for sheet_name, df in sheets:
+                        self.write_formatted_sheet(workbook.add_worksheet(sheet_name), df, formats)
+                        self.metrics.count('sheets_written')
+                        self.metrics.count('rows_written', len(df))
+                finally:
+                    workbook.close()
+
+    @staticmethod
+    def sheet_names(names):
+        # Excel sheet names are at most 31 characters and unique regardless of case;
+        # names that clash once cut get a ~2, ~3, ... suffix
+        used = set()
+        sheet_names = []
+        for name in names:
+            sheet_name = name[:31]
+            number = 1
+            while sheet_name.lower() in used:
+                number += 1
+                suffix = f'~{number}'
+                sheet_name = name[:31 - len(suffix)] + suffix
+            used.add(sheet_name.lower())
+            sheet_names.append(sheet_name)
+        return sheet_names
+
+    def write_sheets_incrementally(self, filepath, sheets, digests, parallel=False):
+        # Render each contest sheet once per version of its data into SHEETS_DIR,
+        # then assemble the workbook from those files. sheets holds
+        # (contest, sheet_name, df) triples.
+        sheet_files = []
+
+        def missing_sheets():
+            for tracker_name, sheet_name, df in sheets:
+                contest_dir = self.output_dir / SHEETS_DIR / quote(tracker_name, safe='')
+                sheet_file = contest_dir / f'{digests[tracker_name]}.xlsx'
+                if not sheet_file.exists():
+                    contest_dir.mkdir(parents=True, exist_ok=True)
+                    for old_file in contest_dir.glob('*.xlsx'):
+                        old_file.unlink()
+                    yield sheet_file, sheet_name, df
+                else:
+                    self.metrics.count('sheets_reused')
+                sheet_files.append((sheet_name, sheet_file))
+
+        with self.metrics.stage('write'):
+            self.render_sheet_files(missing_sheets(), parallel)
+            self.merge_sheet_files(filepath, sheet_files)
+        self.metrics.count('bytes_written', Path(filepath).stat().st_size)
+
+    def write_sheets_parallel(self, filepath, sheets):
+        # Render every sheet into its own file on the process pool, then assemble
+        # the workbook from those files
+        sheet_files = []
+
+        def sheet_jobs(directory):
+            for number, (sheet_name, df) in enumerate(sheets, 1):
+                sheet_file = Path(directory) / f'{number}.xlsx'
+                sheet_files.append((sheet_name, sheet_file))
+                yield sheet_file, sheet_name, df
+
+        with self.metrics.stage('write'), tempfile.TemporaryDirectory(dir=self.output_dir) as directory:
+            self.render_sheet_files(sheet_jobs(directory), parallel=True)
+            self.merge_sheet_files(filepath, sheet_files)
+        self.metrics.count('bytes_written', Path(filepath).stat().st_size)
+
+    def render_sheet_files(self, sheet_jobs, parallel=False):
+        # Write each (sheet_file, sheet_name, df) job as a single-sheet workbook. In
+        # parallel, at most render_workers frames are waiting to be written at a time.
+        if not parallel or self.render_workers <= 1:
+            for sheet_file, sheet_name, df in sheet_jobs:
+                self.write_excel_sheets(sheet_file, [(sheet_name, df)])
+            return
+
+        with ProcessPoolExecutor(max_workers=self.render_workers) as executor:
+            pending = set()
+            for sheet_file, sheet_name, df in sheet_jobs:
+                if len(pending) >= self.render_workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        future.result()
+                pending.add(executor.submit(write_workbook, sheet_file, [(sheet_name, df)], self.fast_excel))
+                self.metrics.count('sheets_written')
+                self.metrics.count('rows_written', len(df))
+            for future in wait(pending).done:
+                future.result()
+
+    @staticmethod
+    def merge_sheet_files(filepath, sheet_files):
+        # Lay out an empty workbook with the right sheet names, then copy in each
+        # sheet's XML from its single-sheet file. write_excel_file gives every file
+        # the same styles and writes strings inline, so the sheets need no rewriting.
+        skeleton = io.BytesIO()
+        workbook = xlsxwriter.Workbook(skeleton, {'in_memory': True})
+        for sheet_name, _ in sheet_files:
+            workbook.add_worksheet(sheet_name)
+        workbook.close()
+
+        parts = {}
+        for number, (_, sheet_file) in enumerate(sheet_files, start=1):
+            with zipfile.ZipFile(sheet_file) as sheet_zip:
+                sheet_xml = sheet_zip.read('xl/worksheets/sheet1.xml')
+                if number == 1:
+                    parts['xl/styles.xml'] = sheet_zip.read('xl/styles.xml')
+                else:
+                    # Only the first sheet is the selected tab
+                    sheet_xml = sheet_xml.replace(b'<sheetView tabSelected="1" ', b'<sheetView ', 1)
+                parts[f'xl/worksheets/sheet{number}.xml'] = sheet_xml
+
+        with zipfile.ZipFile(skeleton) as skeleton_zip, \
+                zipfile.ZipFile(filepath, 'w', zipfile.ZIP_DEFLATED) as workbook_zip:
+            for item in skeleton_zip.infolist():
+                workbook_zip.writestr(item, parts.get(item.filename) or skeleton_zip.read(item.filename))
+
+    @staticmethod
+    def add_excel_formats(workbook):
+        # The same styles apply_excel_formatting sets cell by cell
+        common = {
+            'font_name': 'Arial',
+            'bold': True,
+            'pattern': 1,
+            'align': 'center',
+            'valign': 'vcenter',
+            'bottom': 2,  # medium
+        }
+        return {
+            'header': workbook.add_format({**common, 'font_size': 18, 'bg_color': '#ADEAEA'}),
+            'body': workbook.add_format({**common, 'font_size': 14, 'bg_color': '#C7ECEC'}),
+        }
+
+    @staticmethod
+    def write_formatted_sheet(worksheet, df, formats):
+        # Set column widths. xlsxwriter adds Excel's 5px cell padding to a width,
+        # so take it off to store the same widths as apply_excel_formatting.
+        worksheet.set_column(0, 0, 12 - 5 / 7)  # Rank column
+        if len(df.columns) > 1:
+            worksheet.set_column(1, len(df.columns) - 1, 35 - 5 / 7)
+
+        worksheet.set_row(0, 25)
+        worksheet.write_row(0, 0, df.columns.tolist(), formats['header'])
+
+        # Missing values become empty styled cells, numpy scalars plain Python numbers
+        values = df.astype(object).where(df.notna(), None).values.tolist()
+        for row_num, row in enumerate(values, start=1):
+            worksheet.set_row(row_num, 25)
+            worksheet.write_row(row_num, 0, row, formats['body'])
+
+    def apply_excel_formatting(self, worksheet, df):
+        # Define styles
+        styles = {
+            'header': {
+                'font': Font(name='Arial', size=18, bold=True),
+                'fill': PatternFill(start_color='00ADEAEA', end_color='00ADEAEA', fill_type='solid'),
+            },
+            'body': {
+                'font': Font(name='Arial', size=14, bold=True),
+                'fill': PatternFill(start_color='00C7ECEC', end_color='00C7ECEC', fill_type='solid'),
+            },
+            'common': {
+                'alignment': Alignment(horizontal='center', vertical='center'),
+                'border': Border(bottom=Side(style='medium'))
+            }
+        }
+
+        # Set column widths
+        worksheet.column_dimensions['A'].width = 12  # Rank column
+        for col in worksheet.columns:
+            column = col[0].column_letter
+            if column != 'A':
+                worksheet.column_dimensions[column].width = 35
+
+        # Set row height
+        for row in range(1, worksheet.max_row + 1):
+            worksheet.row_dimensions[row].height = 25
+
+        # Apply formatting
+        for col_num, value in enumerate(df.columns.values):
+            cell = worksheet.cell(row=1, column=col_num + 1)
+            cell.value = value
+            self.apply_cell_style(cell, styles['header'], styles['common'])
+
+        for row_num, row in enumerate(df.values, start=2):
+            for col_num, value in enumerate(row, start=1):
+                cell = worksheet.cell(row=row_num, column=col_num)
+                cell.value = value
+                self.apply_cell_style(cell, styles['body'], styles['common'])
+
+    @staticmethod
+    def apply_cell_style(cell, specific_style, common_style):
+        for style_dict in (specific_style, common_style):
+            for attr, value in style_dict.items():
+                setattr(cell, attr, value)
+
+    @staticmethod
+    def decode_page(body, columns=PAGE_COLUMNS):
+        # Parse a page and keep only the given columns, so the row objects are
+        # dropped as soon as the page is decoded. Returns (columns, total). A body
+        # that is not a leaderboard page raises ValueError, KeyError or TypeError.
+        json_data = orjson.loads(body) if orjson else json.loads(body)
+        if not isinstance(json_data, dict):
+            raise ValueError(f'expected a JSON object, got {type(json_data).__name__}')
+        models = json_data.get('models') or []
+        page = {}
+        for column in columns:
+            field, typecode = PAGE_FIELDS[column]
+            values = map(itemgetter(field), models)
+            page[column] = list(values) if typecode is None else array(typecode, values)
+        return page, json_data.get('total')
+
+    @staticmethod
+    def column_buffers(columns):
+        return {column: [] if PAGE_FIELDS[column][1] is None else array(PAGE_FIELDS[column][1]) for column in columns}
+
+    @staticmethod
+    def buffer_frame(buffer):
+        # Typed buffers are handed to pandas as numpy views instead of value by value
+        return pd.DataFrame({column: values if isinstance(values, list) else np.frombuffer(values, values.typecode)
+                             for column, values in buffer.items()})
+
+    def fetch_page(self, tracker_name, offset, limit, revalidate=False, columns=PAGE_COLUMNS):
+        # With revalidate, even fresh cached pages are checked with the server.
+        # Returns the page as column buffers (see decode_page) and the total.
+        url = f'{self.base_url}/rest/contests/{tracker_name}/leaderboard?offset={offset}&limit={limit}'
+        cached = self.cache.get(tracker_name, offset, limit) if self.cache else None
+        from_cache = True
+
+        if cached and not revalidate and (cached['fresh'] or self.cache.is_final(tracker_name)):
+            body = cached['body']
+        else:
+            # Revalidate a stale page instead of downloading it again
+            headers = {}
+            if cached and cached['etag']:
+                headers['If-None-Match'] = cached['etag']
+            if cached and cached['last_modified']:
+                headers['If-Modified-Since'] = cached['last_modified']
+
+            # Covers connection setup, TLS and the transfer; requests does not time them separately
+            with self.metrics.stage('fetch.download'):
+                response = self.client.get(url, headers=headers)
+                content = response.content
+            if cached and response.status_code == 304:
+                body = cached['body']
+                self.cache.touch(tracker_name, offset, limit)
+                self.metrics.count('cache_revalidated')
+            else:
+                body = content
+                from_cache = False
+                self.metrics.count('bytes_downloaded', len(body))
+        if from_cache:
+            self.metrics.count('cache_hits')
+
+        with self.metrics.stage('fetch.parse'):
+            page, total = self.decode_page(body, columns)
+        # Only pages that decoded are cached, so a bad body is fetched again next time
+        if not from_cache and self.cache:
+            self.cache.put(tracker_name, offset, limit, body,
+                           response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        rows = len(page['Name'])
+        self.metrics.count('pages')
+        self.metrics.count('rows', rows)
+        self.emit('page_fetched', contest=tracker_name, offset=offset, rows=rows, bytes=len(body), cached=from_cache)
+        return page, total
+
+    def fetch_first_page(self, tracker_name, revalidate=False, columns=PAGE_COLUMNS):
+        # Ask for a large first page and fall back to the standard size if the
+        # server refuses it
+        try:
+            return self.fetch_page(tracker_name, 0, self.page_size, revalidate, columns), self.page_size
+        except requests.HTTPError as e:
+            if self.page_size <= PAGE_SIZE or e.response is None or e.response.status_code not in (400, 422):
+                raise
+            return self.fetch_page(tracker_name, 0, PAGE_SIZE, revalidate, columns), PAGE_SIZE
+
+    def iter_contest_pages(self, tracker_names, errors, max_workers=None, final=False, revalidate=False,
+                           columns=PAGE_COLUMNS):
+        # Fetch the pages of every contest on one bounded pool and yield
+        # (contest, page) for each page in offset order, then (contest, None)
+        # once the contest is complete. The first page of a contest tells us its
+        # total and the page size the server honours; the remaining pages are then
+        # requested in parallel, at most max_workers pages ahead of the last page
+        # yielded, until the total or an empty page is reached. Failed contests
+        # are recorded in errors before their (contest, None) is yielded.
+        max_workers = max_workers or self.max_workers
+        names = list(dict.fromkeys(tracker_names))
+        state = {name: {'step': None, 'next': 0, 'end': math.inf, 'emit': 0, 'pages': {}, 'in_flight': 0}
+                 for name in names}
+        pending = {}
+
+        def can_submit(name):
+            contest = state[name]
+            if name in errors or contest['next'] >= contest['end']:
+                return False
+            if contest['step'] is None:
+                return not contest['in_flight']
+            return contest['next'] < contest['emit'] + max_workers * contest['step']
+
+        def submit(name):
+            contest = state[name]
+            contest['in_flight'] += 1
+            if contest['step'] is None:
+                self.emit('contest_started', contest=name)
+                pending[executor.submit(self.fetch_first_page, name, revalidate, columns)] = (name, 0)
+            else:
+                offset = contest['next']
+                contest['next'] += contest['step']
+                future = executor.submit(self.fetch_page, name, offset, contest['step'], revalidate, columns)
+                pending[future] = (name, offset)
+
+        def receive(name, offset, future):
+            contest = state[name]
+            try:
+                result = future.result()
+            except (requests.RequestException, ValueError, KeyError, TypeError) as e:
+                # A page that does not decode fails its contest, like a network error
+                errors[name] = e
+                contest['end'] = 0
+                return
+
+            if contest['step'] is None:
+                (page, total), limit = result
+                rows = len(page['Name'])
+                # A short first page with more rows to come means the server capped the page size
+                contest['step'] = rows if 0 < rows < limit else limit
+                contest['next'] = contest['step']
+            else:
+                page, total = result
+
+            if total is not None:
+                contest['end'] = min(contest['end'], total)
+            if len(page['Name']):
+                contest['pages'][offset] = page
+            else:
+                contest['end'] = min(contest['end'], offset)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            try:
+                while True:
+                    # Keep the pool full, taking one page from each contest in turn
+                    submitted = True
+                    while submitted and len(pending) < max_workers:
+                        submitted = False
+                        for name in names:
+                            if len(pending) < max_workers and can_submit(name):
+                                submit(name)
+                                submitted = True
+
+                    if not pending:
+                        break
+
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        name, offset = pending.pop(future)
+                        contest = state[name]
+                        contest['in_flight'] -= 1
+                        if not future.cancelled() and name not in errors and offset < contest['end']:
+                            receive(name, offset, future)
+
+                        # Yield whatever is now contiguous, and drop requests past the end
+                        while contest['emit'] < contest['end'] and contest['emit'] in contest['pages']:
+                            yield name, contest['pages'].pop(contest['emit'])
+                            contest['emit'] += contest['step']
+                        for other, (other_name, other_offset) in pending.items():
+                            if other_name == name and other_offset >= contest['end']:
+                                other.cancel()
+
+                        if not contest['in_flight'] and not can_submit(name):
+                            yield name, None
+            finally:
+                for future in pending:
+                    future.cancel()
+
+        if self.cache:
+            for name in names:
+                if final and name not in errors:
+                    self.cache.mark_final(name)
+            self.cache.evict()
+
+    def fetch_contests(self, tracker_names, max_workers=None, on_contest_fetched=None, final=False,
+                       revalidate=False, columns=PAGE_COLUMNS):
+        # Build one DataFrame per contest from the page stream, CHUNK_ROWS rows at a
+        # time. columns are PAGE_FIELDS keys; Name is always included.
+        with self.metrics.stage('fetch'):
+            errors = {}
+            names = list(dict.fromkeys(tracker_names))
+            columns = list(dict.fromkeys(['Name', *columns]))
+            buffers = {name: self.column_buffers(columns) for name in names}
+            chunks = {name: [] for name in names}
+            results = {}
+
+            for name, page in self.iter_contest_pages(names, errors, max_workers, final, revalidate, columns):
+                buffer = buffers[name]
+                if page is not None:
+                    for column, values in page.items():
+                        buffer[column].extend(values)
+                if buffer['Name'] and (page is None or len(buffer['Name']) >= CHUNK_ROWS):
+                    chunks[name].append(self.buffer_frame(buffer))
+                    buffers[name] = self.column_buffers(columns)
+
+                if page is None:
+                    frames = chunks.pop(name)
+                    results[name] = pd.concat(frames, ignore_index=True) if frames and name not in errors else None
+                    if on_contest_fetched:
+                        on_contest_fetched(name, results[name], len(results), len(names))
+
+            return results, errors
+
+    def fetch_hackerrank_data(self, tracker_name, columns=PAGE_COLUMNS):
+        results, errors = self.fetch_contests([tracker_name], columns=columns)
+        if tracker_name in errors:
+            raise errors[tracker_name]
+        return results[tracker_name]
+
+    def generate(self, tracker_names, final=False, incremental=False, on_event=None):
+        # Returns a report of the contests written, per-contest fetch errors,
+        # warnings and the files created. on_event receives progress events as they happen.
+        self.on_event = on_event
+        report = {'contests': [], 'errors': {}, 'warnings': [], 'files': []}
+        scores = ScoreStore(tracker_names)
+        names = list(dict.fromkeys(tracker_names))
+        sheet_names = dict(zip(names, self.sheet_names(names)))
+        total_sheets = len(names)
+        contest_ids = names
+        incremental = incremental and self.store is not None
+
+        # In incremental mode only new or stale contests are fetched
+        if incremental:
+            contest_ids = [name for name in contest_ids if not self.store.is_fresh(
+                name, self.cache is not None and self.cache.is_final(name))]
+
+        # Fetch every contest concurrently before writing any sheets
+        results, errors = self.fetch_contests(
+            contest_ids,
+            on_contest_fetched=lambda name, df, done, total: self.emit(
+                'contest_fetched', contest=name, rows=0 if df is None else len(df), progress=int(done / total * 50)),
+            final=final
+        )
+
+        # Keep the contest store up to date and fill in the contests that were not fetched
+        digests = {}
+        if self.store:
+            for name in names:
+                if name in errors:
+                    continue
+                if name not in results:
+                    results[name] = self.store.load(name)
+                    digests[name] = self.store.get_digest(name)
+                elif results[name] is not None:
+                    digests[name] = self.store.save(name, results[name])
+
+        def contest_sheets():
+            for idx, tracker_name in enumerate(names, 1):
+                if tracker_name in errors:
+                    report['errors'][tracker_name] = str(errors[tracker_name])
+                    self.emit('error', contest=tracker_name,
+                              message=f"Failed to fetch data for {tracker_name}: {str(errors[tracker_name])}")
+                    continue
+
+                df = results[tracker_name]
+                if df is None:
+                    continue
+
+                if df.empty:
+                    report['warnings'].append(f"{tracker_name} returned no data")
+                    self.emit('warning', contest=tracker_name, message=f"{tracker_name} returned no data")
+                    continue
+
+                # Add the contest to the total leaderboard
+                with self.metrics.stage('aggregate'):
+                    scores.add_contest(tracker_name, df['Name'], df['Score'])
+                report['contests'].append(tracker_name)
+
+                # Write to the Excel file
+                yield tracker_name, sheet_names[tracker_name], self.contest_sheet(df)
+
+                # Update progress
+                self.emit('contest_written', contest=tracker_name, progress=50 + int(idx / total_sheets * 50))
+
+        # Create a single workbook for all contest sheets
+        contests_filepath = self.output_dir / 'ContestLeaderboards.xlsx'
+        # Big runs render their sheets on a process pool; the pieces are merged, which needs the fast writer
+        rendered = [results[name] for name in contest_ids
+                    if name not in errors and results.get(name) is not None and not results[name].empty]
+        parallel = (self.fast_excel and self.render_workers > 1 and len(rendered) > 1
+                    and sum(len(df) for df in rendered) >= PARALLEL_RENDER_ROWS)
+        if incremental and self.fast_excel:
+            self.write_sheets_incrementally(contests_filepath, contest_sheets(), digests, parallel)
+        elif parallel:
+            self.write_sheets_parallel(contests_filepath, ((sheet, df) for _, sheet, df in contest_sheets()))
+        else:
+            self.write_excel_file(contests_filepath, ((sheet, df) for _, sheet, df in contest_sheets()))
+        report['files'].append(str(contests_filepath))
+
+        # Generate total leaderboard in a separate file
+        if report['contests']:
+            report['files'].append(str(self.write_total_leaderboard(scores)))
+        return report
+
+    @staticmethod
+    def contest_sheet(df):
+        # Sort the DataFrame
+        df = df.sort_values(by='Score', ascending=False)
+        # Add rank after sorting
+        df.insert(0, 'Rank', range(1, len(df) + 1))
+        return df
+
+    def write_total_leaderboard(self, scores):
+        with self.metrics.stage('aggregate'):
+            df_total = scores.to_frame()
+        return self.generateExcelSheet('TotalHackerrankLeaderBoard', df_total)
+
+    @staticmethod
+    def read_roster(filepath):
+        # Load only the Roll number and Hackerrank columns of a student batch
+        filepath = Path(filepath)
+        suffix = filepath.suffix.lower()
+        if suffix == '.csv':
+            return pd.read_csv(filepath, usecols=ROSTER_COLUMNS, dtype={'Hackerrank': str})[ROSTER_COLUMNS]
+        if suffix == '.parquet':
+            return pd.read_parquet(filepath, columns=ROSTER_COLUMNS)
+
+        # Stream the first sheet and keep just the two columns, instead of
+        # converting every cell of the roster like pd.read_excel does
+        workbook = openpyxl.load_workbook(filepath, read_only=True, data_only=True)
+        try:
+            worksheet = workbook.worksheets[0]
+            worksheet.reset_dimensions()  # some writers store a wrong sheet size
+            rows = worksheet.iter_rows(values_only=True)
+            header = list(next(rows, ()))
+            missing = [name for name in ROSTER_COLUMNS if name not in header]
+            if missing:
+                raise KeyError(f"{filepath.name} has no {' or '.join(missing)} column")
+            positions = [header.index(name) for name in ROSTER_COLUMNS]
+
+            columns = [[] for _ in ROSTER_COLUMNS]
+            blank_rows = 0
+            for row in rows:
+                # Like pd.read_excel, keep empty rows between students but not after the last one
+                if all(value is None for value in row):
+                    blank_rows += 1
+                    continue
+                for column, position in zip(columns, positions):
+                    column.extend([None] * blank_rows)
+                    column.append(row[position] if position < len(row) else None)
+                blank_rows = 0
+        finally:
+            workbook.close()
+
+        # Whole-number floats become ints, as pd.read_excel does, and handles are always text
+        roll_numbers, handles = [[int(value) if isinstance(value, float) and value.is_integer() else value
+                                  for value in column] for column in columns]
+        handles = [None if value is None else str(value) for value in handles]
+        return pd.DataFrame({'Roll number': roll_numbers, 'Hackerrank': pd.Series(handles, dtype=object)})
+
+    def read_rosters(self, filepaths, stack=True):
+        # Several rosters are parsed in parallel worker processes and stacked in the given
+        # order, or with stack=False returned as one frame per file
+        filepaths = [str(filepath) for filepath in filepaths]
+        self.metrics.count('rosters', len(filepaths))
+        if len(filepaths) == 1:
+            frames = [self.read_roster(filepaths[0])]
+        else:
+            with ProcessPoolExecutor(max_workers=min(len(filepaths), os.cpu_count() or 1)) as executor:
+                frames = list(executor.map(LeaderboardEngine.read_roster, filepaths))
+        return pd.concat(frames, ignore_index=True) if stack else frames
+
+    @staticmethod
+    def normalize_handles(handles):
+        # ' @Name ' and 'name' are the same handle
+        handles = handles.where(handles.isna(), handles.astype(str))
+        return handles.str.strip().str.lstrip('@').str.strip().str.lower()
+
+    def alias_table(self):
+        if self.aliases is None:
+            self.aliases = AliasTable(self.output_dir / ALIAS_FILE)
+        return self.aliases
+
+    def import_aliases(self, filepath):
+        # Add the Roll number / Hackerrank pairs of a roster file as known handles
+        with self.metrics.stage('read'):
+            aliases = self.read_roster(filepath)
+            handles = self.normalize_handles(aliases['Hackerrank'])
+        return self.alias_table().add(aliases['Roll number'], handles, 'manual')
+
+    def combine(self, student_file, hackerrank_file, on_event=None, match_threshold=None):
+        # Match a student batch against a leaderboard and write CombinedLeaderboard.xlsx.
+        # student_file may also be a list of rosters (xlsx, CSV or Parquet) that make up one batch.
+        # With a match_threshold, students left unmatched are matched through known aliases
+        # and fuzzy handle matching (see resolve_handles). Returns the counts shown in the summary.
+        self.on_event = on_event
+        student_files = [student_file] if isinstance(student_file, (str, Path)) else list(student_file)
+
+        # Read student data file
+        self.emit('stage', message="Reading student data file...", progress=25)
+        with self.metrics.stage('read'):
+            student_df = self.read_rosters(student_files)
+            student_df['Hackerrank'] = self.normalize_handles(student_df['Hackerrank'])
+
+        # Read Hackerrank leaderboard file
+        self.emit('stage', message="Reading Hackerrank leaderboard file...", progress=50)
+        leaderboard = self.index_leaderboard(hackerrank_file, fuzzy=match_threshold is not None)
+
+        self.emit('stage', message="Processing data...", progress=75)
+        matched_df, unmatched_df = self.match_roster(student_df, leaderboard, match_threshold)
+
+        # Generate Excel file
+        self.emit('stage', message="Generating Excel file...", progress=90)
+        combined_filepath = self.output_dir / 'CombinedLeaderboard.xlsx'
+        self.write_excel_file(combined_filepath, [
+            ('Matched Entries', matched_df),
+            ('Unmatched Entries', unmatched_df),
+        ])
+
+        # Prepare summary
+        return {**self.match_summary(matched_df, unmatched_df), 'file': str(combined_filepath)}
+
+    def combine_batches(self, student_files, hackerrank_file, on_event=None, match_threshold=None):
+        # Match every roster (one section each) against one leaderboard, read and indexed once.
+        # Each roster gets its own CombinedLeaderboard_<roster>.xlsx, written in parallel, and
+        # UnmatchedHackerrankUsers.xlsx lists who no roster matched.
+        self.on_event = on_event
+        student_files = [str(filepath) for filepath in student_files]
+
+        self.emit('stage', message=f"Reading {len(student_files)} student data files...", progress=10)
+        with self.metrics.stage('read'):
+            rosters = self.read_rosters(student_files, stack=False)
+
+        self.emit('stage', message="Reading Hackerrank leaderboard file...", progress=30)
+        leaderboard = self.index_leaderboard(hackerrank_file, fuzzy=match_threshold is not None)
+        hackerrank_df, score_columns = leaderboard[:2]
+
+        self.emit('stage', message="Processing data...", progress=50)
+        batches = []
+        matched_anywhere = pd.Series(False, index=hackerrank_df.index)
+        used_names = set()
+        for filepath, student_df in zip(student_files, rosters):
+            student_df['Hackerrank'] = self.normalize_handles(student_df['Hackerrank'])
+            matched_df, unmatched_df = self.match_roster(student_df, leaderboard, match_threshold)
+            with self.metrics.stage('match'):
+                matched_names = matched_df.loc[matched_df['Name'] != '', 'Name'].str.lower()
+                matched_anywhere |= hackerrank_df['Name_lower'].isin(matched_names)
+
+            # Rosters from different folders may share a file name
+            name = base_name = Path(filepath).stem
+            number = 1
+            while name.lower() in used_names:
+                number += 1
+                name = f'{base_name}_{number}'
+            used_names.add(name.lower())
+
+            batches.append({
+                'roster': filepath,
+                'file': str(self.output_dir / f'CombinedLeaderboard_{name}.xlsx'),
+                'sheets': [('Matched Entries', matched_df), ('Unmatched Entries', unmatched_df)],
+                **self.match_summary(matched_df, unmatched_df),
+            })
+
+        with self.metrics.stage('match'):
+            unmatched_df = self.unmatched_entries(hackerrank_df[~matched_anywhere], score_columns)
+        unmatched_filepath = self.output_dir / 'UnmatchedHackerrankUsers.xlsx'
+        jobs = [(batch['file'], batch.pop('sheets')) for batch in batches]
+        jobs.append((str(unmatched_filepath), [('Unmatched Entries', unmatched_df)]))
+
+        # Write the workbooks across a process pool
+        self.emit('stage', message=f"Generating {len(jobs)} Excel files...", progress=70)
+        with self.metrics.stage('write'):
+            if len(jobs) == 1:
+                self.write_excel_file(*jobs[0])
+            else:
+                with ProcessPoolExecutor(max_workers=min(len(jobs), os.cpu_count() or 1)) as executor:
+                    futures = [executor.submit(write_workbook, filepath, sheets, self.fast_excel)
+                               for filepath, sheets in jobs]
+                    for done, ((filepath, sheets), future) in enumerate(zip(jobs, futures), 1):
+                        self.metrics.count('bytes_written', future.result())
+                        self.metrics.count('sheets_written', len(sheets))
+                        self.emit('stage', message=f"Finished {Path(filepath).name}!",
+                                  progress=70 + int(done / len(jobs) * 30))
+
+        return {
+            'batches': batches,
+            'unmatched_hackerrank_users': len(unmatched_df),
+            'unmatched_file': str(unmatched_filepath),
+        }
+
+    def index_leaderboard(self, hackerrank_file, fuzzy=False):
+        # Read a leaderboard and index it by lowercase handle, ready for match_roster.
+        # Returns (leaderboard, score columns, index, HandleIndex or None); the
+        # HandleIndex is only built for fuzzy matching.
+        with self.metrics.stage('read'):
+            hackerrank_df = self.read_leaderboard(hackerrank_file)
+
+        with self.metrics.stage('match'):
+            # Drop existing Rank and Total Score columns if they exist
+            columns_to_drop = ['Rank', 'Total Score']
+            hackerrank_df = hackerrank_df.drop(
+                columns=[col for col in columns_to_drop if col in hackerrank_df.columns])
+
+            # Clean data and convert to lowercase for matching
+            hackerrank_df['Name'] = hackerrank_df['Name'].str.strip()
+            hackerrank_df['Name_lower'] = hackerrank_df['Name'].str.lower()
+
+            # Get score columns
+            score_columns = [col for col in hackerrank_df.columns
+                             if col not in ['Name', 'Name_lower', 'Rank', 'Total Score']]
+
+            # A handle listed more than once keeps its first (highest ranked) row
+            leaderboard_index = (hackerrank_df.dropna(subset=['Name_lower'])
+                                 .drop_duplicates('Name_lower')
+                                 .set_index('Name_lower')[['Name'] + score_columns])
+            handle_index = HandleIndex(leaderboard_index.index) if fuzzy else None
+        return hackerrank_df, score_columns, leaderboard_index, handle_index
+
+    def match_roster(self, student_df, leaderboard, match_threshold=None):
+        # Returns the Matched Entries and Unmatched Entries frames for one roster.
+        # With a match_threshold, Matched Entries also says how each student was matched.
+        hackerrank_df, score_columns, leaderboard_index, handle_index = leaderboard
+        with self.metrics.stage('match'):
+            # Create matched sheet
+            # Match all students in one left join, using the actual Hackerrank name
+            if match_threshold is None:
+                matched_df = student_df.join(leaderboard_index, on='Hackerrank')
+            else:
+                handles, how = self.resolve_handles(student_df, leaderboard, match_threshold)
+                matched_df = student_df.join(leaderboard_index, on=handles.to_numpy())
+                matched_df['Match'] = how
+            found = matched_df['Name'].notna()
+            self.metrics.count('students', len(matched_df))
+            self.metrics.count('students_matched', int(found.sum()))
+            matched_df.loc[~found, 'Name'] = ''  # Empty name for students without a match
+            matched_df.loc[~found, score_columns] = 0
+
+            # Keep whole-number score columns as integers
+            for col in score_columns:
+                values = matched_df[col]
+                if pd.api.types.is_float_dtype(values) and values.notna().all() and (values % 1 == 0).all():
+                    matched_df[col] = values.astype('int64')
+
+            # Calculate total score for matched entries
+            matched_df['Total Score'] = matched_df[score_columns].sum(axis=1)
+            matched_df = matched_df.sort_values('Total Score', ascending=False)
+            matched_df.insert(0, 'Rank', range(1, len(matched_df) + 1))
+
+            # Create unmatched sheet
+            # Get all Hackerrank usernames that weren't matched
+            matched_usernames = matched_df[matched_df['Name'] != '']['Name'].str.lower()
+            unmatched_df = self.unmatched_entries(
+                hackerrank_df[~hackerrank_df['Name_lower'].isin(matched_usernames)], score_columns)
+
+            # Reorder columns for both dataframes
+            final_cols = ['Rank', 'Roll number', 'Name'] + score_columns + ['Total Score']
+            if match_threshold is not None:
+                final_cols.append('Match')
+            return matched_df[final_cols], unmatched_df
+
+    def resolve_handles(self, student_df, leaderboard, match_threshold):
+        # The leaderboard handle for every student. Students whose own handle is not
+        # on the leaderboard get a known alias of their roll number, or else the most
+        # similar leaderboard handle no other student has, if it is at least
+        # match_threshold similar and clearly closer than the next one. Only exact
+        # matches are remembered in the alias table. Returns the handles and how each
+        # student was matched.
+        leaderboard_index, handle_index = leaderboard[2:]
+        handles = student_df['Hackerrank'].copy()
+        found = handles.isin(leaderboard_index.index)
+        how = pd.Series(np.where(found, 'exact', ''), index=handles.index, dtype=object)
+        claimed = set(handles[found])
+        remainder = student_df.index[~found]
+
+        # Handles known from earlier runs or an imported alias file
+        aliases = self.alias_table()
+        known = aliases.lookup(student_df.loc[remainder, 'Roll number'])
+        for row in remainder:
+            for handle in known.get(str(student_df.at[row, 'Roll number']), []):
+                if handle in leaderboard_index.index and handle not in claimed:
+                    handles[row], how[row] = handle, 'alias'
+                    claimed.add(handle)
+                    break
+
+        # Fuzzy matches, most similar pairs first, so each handle goes to its closest student.
+        # A student with two close candidates is left for a person to sort out.
+        pairs = []
+        for row in remainder:
+            if how[row] or pd.isna(handles[row]):
+                continue
+            candidates = [(similarity, handle_index.handles[number])
+                          for similarity, number in handle_index.lookup(handles[row], match_threshold - FUZZY_MARGIN)
+                          if handle_index.handles[number] not in claimed]
+            if candidates and candidates[0][0] >= match_threshold and (
+                    len(candidates) == 1 or candidates[0][0] - candidates[1][0] >= FUZZY_MARGIN):
+                pairs.append((*candidates[0], row))
+        for similarity, handle, row in sorted(pairs, key=lambda pair: -pair[0]):
+            if handle not in claimed:
+                handles[row], how[row] = handle, f'fuzzy ({similarity:.2f})'
+                claimed.add(handle)
+
+        exact = how == 'exact'
+        aliases.add(student_df.loc[exact, 'Roll number'], handles[exact], 'exact')
+        self.metrics.count('students_matched_alias', int((how == 'alias').sum()))
+        self.metrics.count('students_matched_fuzzy', int(how.str.startswith('fuzzy').sum()))
+        return handles, how
+
+    @staticmethod
+    def unmatched_entries(unmatched_hackerrank, score_columns):
+        # Prepare unmatched DataFrame
+        unmatched_df = unmatched_hackerrank.drop('Name_lower', axis=1)
+        unmatched_df['Roll number'] = ''  # Empty roll number for unmatched Hackerrank users
+        unmatched_df['Total Score'] = unmatched_df[score_columns].sum(axis=1)
+        unmatched_df = unmatched_df.sort_values('Total Score', ascending=False)
+        unmatched_df.insert(0, 'Rank', range(1, len(unmatched_df) + 1))
+        return unmatched_df[['Rank', 'Roll number', 'Name'] + score_columns + ['Total Score']]
+
+    @staticmethod
+    def match_summary(matched_df, unmatched_df):
+        summary = {
+            'students_with_scores': len(matched_df[matched_df['Name'] != '']),
+            'students_without_scores': len(matched_df[matched_df['Name'] == '']),
+            'unmatched_hackerrank_users': len(unmatched_df),
+        }
+        if 'Match' in matched_df.columns:
+            summary['students_matched_by_alias'] = int((matched_df['Match'] == 'alias').sum())
+            summary['students_matched_fuzzy'] = int(matched_df['Match'].str.startswith('fuzzy').sum())
+        return summary
+
+
+class LeaderboardWatch:
+    # Live standings of running contests. Every poll refetches the contests,
+    # compares them with the previous snapshot and applies only the rows that
+    # changed; nothing is written to disk until write() is called.
+    def __init__(self, engine, tracker_names):
+        self.engine = engine
+        self.contests = list(dict.fromkeys(tracker_names))
+        self.sheet_names = dict(zip(self.contests, engine.sheet_names(self.contests)))
+        self.scores = ScoreStore(self.contests)
+        self.frames = {}  # contest -> leaderboard as last fetched
+        self.snapshots = {}  # contest -> Score Series indexed by Name
+        self.names = []
+        self.totals = np.zeros(0)
+        self.ranks = np.zeros(0, dtype='int64')
+        self.polls = 0
+        # poll() runs on the watch thread, write() may be called from another one
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()
+
+    def poll(self):
+        # Returns the participants whose scores, total or rank changed, as
+        # (participant number, rank, name, contest scores..., total) rows
+        started = time.perf_counter()
+        results, errors = self.engine.fetch_contests(self.contests, revalidate=True)
+
+        with self.lock, self.engine.metrics.stage('aggregate'):
+            touched = []
+            for name in self.contests:
+                df = results.get(name)
+                if df is None:
+                    continue
+                current = df.drop_duplicates('Name', keep='last').set_index('Name')['Score']
+                previous = self.snapshots.get(name, current.iloc[:0])
+
+                # New or rescored participants, and those who dropped off the leaderboard
+                before = previous.reindex(current.index)
+                changed = current[before.isna() | (before != current)]
+                removed = previous.index.difference(current.index)
+                touched.append(self.scores.update_scores(name, changed.index, changed))
+                if len(removed):
+                    touched.append(self.scores.update_scores(name, removed, np.zeros(len(removed), current.dtype)))
+                self.frames[name], self.snapshots[name] = df, current
+
+            if len(self.scores) > len(self.names):
+                self.names = list(self.scores.ids)
+            totals = self.scores.totals()
+            ranks = self.scores.ranks()
+            known = len(self.ranks)
+            moved = np.flatnonzero((ranks[:known] != self.ranks) | (totals[:known] != self.totals))
+            ids = np.unique(np.concatenate([moved, np.arange(known, len(ranks)), *touched]))
+            self.totals, self.ranks = totals, ranks
+
+            matrix = self.scores.scores
+            rows = [(number, int(ranks[number]), self.names[number], *matrix[:, number].tolist(),
+                     float(totals[number]))
+                    for number in ids.tolist()]
+            self.polls += 1
+            self.engine.metrics.count('polls')
+
+        return {'poll': self.polls, 'contests': self.contests, 'participants': len(self.names), 'rows': rows,
+                'errors': {name: str(error) for name, error in errors.items()},
+                'seconds': time.perf_counter() - started}
+
+    def run(self, interval=WATCH_INTERVAL, stop=None, on_event=None):
+        # Poll every interval seconds until stop is set, emitting a 'standings'
+        # event with each poll's changes
+        stop = stop or threading.Event()
+        self.engine.on_event = on_event
+        while not stop.is_set():
+            started = time.monotonic()
+            self.engine.emit('standings', **self.poll())
+            stop.wait(max(0, interval - (time.monotonic() - started)))
+
+    def write(self):
+        # Write the contest sheets and the total leaderboard as they stand now.
+        # Polling carries on while the workbooks are written.
+        with self.write_lock:
+            with self.lock:
+                frames = [(self.sheet_names[name], self.frames[name]) for name in self.contests
+                          if name in self.frames and not self.frames[name].empty]
+                df_total = self.scores.to_frame()
+
+            contests_filepath = self.engine.output_dir / 'ContestLeaderboards.xlsx'
+            self.engine.write_excel_file(contests_filepath,
+                                         ((sheet_name, self.engine.contest_sheet(df)) for sheet_name, df in frames))
+            files = [str(contests_filepath)]
+            if frames:
+                files.append(str(self.engine.generateExcelSheet('TotalHackerrankLeaderBoard', df_total)))
+            return files
+
+
+def format_event(event):
+    # One line of progress text for an event, or None for per-page events
+    if event['type'] == 'contest_started':
+        return f"Fetching {event['contest']}..."
+    if event['type'] == 'contest_fetched':
+        return f"Fetched {event['contest']}! ({event['rows']} rows)"
+    if event['type'] == 'contest_written':
+        return f"Finished {event['contest']}!"
+    if event['type'] == 'standings':
+        failed = f", {len(event['errors'])} contests failed" if event['errors'] else ''
+        return (f"Poll {event['poll']}: {len(event['rows'])} of {event['participants']} participants changed "
+                f"({event['seconds']:.1f}s{failed})")
+    if event['type'] in ('error', 'warning', 'stage'):
+        return event['message']
+    return None
+
+
+def write_workbook(filepath, sheets, fast_excel=True):
+    # Process pool entry point: write one styled workbook and return its size
+    engine = LeaderboardEngine(Path(filepath).parent, use_cache=False, use_store=False, fast_excel=fast_excel)
+    engine.write_excel_file(filepath, sheets)
+    return Path(filepath).stat().st_size
+
+
+def generate(tracker_names, output_dir=OUTPUT_DIR, final=False, incremental=False, on_event=None, **options):
+    engine = LeaderboardEngine(output_dir, **options)
+    return engine.generate(tracker_names, final=final, incremental=incremental, on_event=on_event)
+
+
+def watch(tracker_names, output_dir=OUTPUT_DIR, interval=WATCH_INTERVAL, stop=None, on_event=None, **options):
+    # Polls until stop is set, then writes the workbooks and returns their paths
+    watcher = LeaderboardWatch(LeaderboardEngine(output_dir, **options), tracker_names)
+    watcher.run(interval, stop, on_event)
+    return watcher.write()
+
+
+def combine(student_file, hackerrank_file, output_dir=OUTPUT_DIR, on_event=None, match_threshold=None,
+            aliases=None, **options):
+    # aliases is a roster file of known Roll number / Hackerrank pairs, added to the alias table first
+    engine = LeaderboardEngine(output_dir, use_cache=False, use_store=False, **options)
+    if aliases:
+        engine.import_aliases(aliases)
+    return engine.combine(student_file, hackerrank_file, on_event=on_event, match_threshold=match_threshold)
+
+
+def combine_batches(student_files, hackerrank_file, output_dir=OUTPUT_DIR, on_event=None, match_threshold=None,
+                    aliases=None, **options):
+    engine = LeaderboardEngine(output_dir, use_cache=False, use_store=False, **options)
+    if aliases:
+        engine.import_aliases(aliases)
+    return engine.combine_batches(student_files, hackerrank_file, on_event=on_event,
+                                  match_threshold=match_threshold)
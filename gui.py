@@ -0,0 +1,518 @@
+import queue
+import threading
+from pathlib import Path
+from tkinter import ttk, messagebox, filedialog
+import tkinter as tk
+import tkinter.font as tkFont
+from engine import LeaderboardEngine, LeaderboardWatch, FUZZY_THRESHOLD, WATCH_INTERVAL, format_event
+
+
+POLL_MS = 100
+MAX_EVENTS_PER_POLL = 500
+
+
+class HackerrankLeaderboard:
+    def __init__(self, engine=None):
+        self.prog_text = ''
+        self.engine = engine or LeaderboardEngine()
+        # Worker threads only ever put events here; the Tk thread drains it
+        self.events = queue.Queue()
+        self.setup_root()
+        self.create_widgets()
+
+    def setup_root(self):
+        self.root = tk.Tk()
+        self.root.title("Hackerrank Leaderboard")
+        self.root.configure(background='#404445')
+        width = 1142
+        height = 697
+        screenwidth = self.root.winfo_screenwidth()
+        screenheight = self.root.winfo_screenheight()
+        alignstr = '%dx%d+%d+%d' % (width, height, (screenwidth - width) / 2, (screenheight - height) / 2)
+        self.root.geometry(alignstr)
+        self.root.resizable(width=False, height=False)
+
+        # Set up window icon and protocol
+        try:
+            self.root.iconbitmap('venv/logo.ico')
+        except:
+            pass  # Skip if icon not found
+        self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
+
+    def create_widgets(self):
+        # Create the Enter ID label
+        self.create_header_label()
+
+        # Create the input field
+        self.create_input_field()
+
+        # Create the final contests and incremental update checkboxes
+        self.create_checkboxes()
+
+        # Create the Generate and Combine buttons
+        self.create_buttons()
+
+    def create_header_label(self):
+        ft = tkFont.Font(family='Helvetica', size=60, weight='bold')
+        id_label = tk.Label(
+            self.root,
+            anchor="center",
+            font=ft,
+            fg="#FF6C40",
+            justify="center",
+            text="ENTER HACKERRANK ID'S!",
+            bg='#404445'
+        )
+        id_label.place(x=15, y=2, width=1100, height=131)
+
+    def create_input_field(self):
+        self.entry = tk.Text(self.root)
+        self.entry["borderwidth"] = "5px"
+        self.entry['background'] = "black"
+        ft = tkFont.Font(family='Times', size=25, weight="bold")
+        self.entry["font"] = ft
+        self.entry.insert('1.0', '   Enter Comma Separated values of HACKERRANK_CONTEST_ID\'s')
+        self.entry.bind("<FocusIn>", self.on_entry_click)
+        self.entry["fg"] = "#FFE33E"
+        self.entry["relief"] = "groove"
+        self.entry.place(x=20, y=120, width=1101, height=361)
+        self.entry["insertbackground"] = "#FFE33E"
+
+    def create_checkboxes(self):
+        self.final_var = tk.BooleanVar(value=False)
+        self.create_styled_checkbox(
+            "Contests are final (never refetch)",
+            self.final_var,
+            (20, 528, 540, 36)
+        )
+
+        self.incremental_var = tk.BooleanVar(value=False)
+        self.create_styled_checkbox(
+            "Incremental update (new/stale contests only)",
+            self.incremental_var,
+            (580, 528, 541, 36)
+        )
+
+        self.watch_var = tk.BooleanVar(value=False)
+        self.create_styled_checkbox(
+            f"Watch live (update every {WATCH_INTERVAL}s, save on demand)",
+            self.watch_var,
+            (20, 488, 540, 36)
+        )
+
+        self.fuzzy_var = tk.BooleanVar(value=False)
+        self.create_styled_checkbox(
+            "Combine: also match typos and known aliases",
+            self.fuzzy_var,
+            (580, 488, 541, 36)
+        )
+
+    def create_styled_checkbox(self, text, variable, placement):
+        checkbox = tk.Checkbutton(
+            self.root,
+            text=text,
+            variable=variable,
+            font=tkFont.Font(family='Times', size=16, weight='bold'),
+            fg="#FFE33E",
+            bg='#404445',
+            activebackground='#404445',
+            activeforeground="#FFE33E",
+            selectcolor='black'
+        )
+        checkbox.place(x=placement[0], y=placement[1], width=placement[2], height=placement[3])
+        return checkbox
+
+    def create_buttons(self):
+        # Generate button
+        self.generate_btn = self.create_styled_button(
+            "Generate Excel Sheets!",
+            self.generate_sheets_command,
+            "maroon",
+            25,
+            (60, 570, 500, 99)
+        )
+
+        # Combine button
+        self.combine_btn = self.create_styled_button(
+            "Combine Existing Excel Sheets",
+            self.combine_excel_sheets,
+            "#006400",
+            25,
+            (580, 570, 490, 99)
+        )
+
+    def create_styled_button(self, text, command, bg_color, font_size, placement):
+        btn = tk.Button(self.root)
+        btn.bind('<Enter>', lambda e: btn.config(background='black'))
+        btn.bind('<Leave>', lambda e: btn.config(background=bg_color))
+        btn.configure(
+            background=bg_color,
+            font=tkFont.Font(family='Times', size=font_size, weight='bold'),
+            borderwidth="7px",
+            fg="#FFE33E",
+            justify="center",
+            relief="groove",
+            text=text,
+            command=command
+        )
+        btn.place(x=placement[0], y=placement[1], width=placement[2], height=placement[3])
+        return btn
+
+    def create_progress_window(self, title="Please Wait..."):
+        progress_window = tk.Toplevel(self.root)
+        try:
+            progress_window.iconbitmap('venv/logo.ico')
+        except:
+            pass
+        progress_window.title(title)
+        progress_window["borderwidth"] = "5px"
+        progress_window["relief"] = "groove"
+        progress_window.geometry("800x400")
+        progress_window.resizable(False, False)
+        progress_window['background'] = '#404445'
+
+        # Configure progress text
+        progress_text = tk.Text(progress_window, height=30, width=80)
+        progress_text.configure(
+            background="grey",
+            fg='white',
+            font=tkFont.Font(family='Times', size=20, weight='bold')
+        )
+        progress_text.pack(pady=80)
+
+        # Configure progress bar
+        style = ttk.Style()
+        style.theme_use('clam')
+        style.configure("TProgressbar",
+                        thickness=20,
+                        troughcolor='lightgrey',
+                        background='#FF6C40')
+        progress = ttk.Progressbar(progress_window, mode='determinate', style="TProgressbar")
+        progress.place(x=50, y=10, width=700, height=50)
+
+        return progress_window, progress_text, progress
+
+    def update_progress(self, text_widget, progress_bar, message, value=None):
+        text_widget.config(state=tk.NORMAL)
+        text_widget.insert(tk.END, message)
+        text_widget.see(tk.END)
+        text_widget.config(state=tk.DISABLED)
+        if value is not None:
+            progress_bar['value'] = value
+
+    def process_events(self, progress_window, progress_text, progress, stats=None):
+        # Apply the events queued by the worker thread, then check again shortly
+        stats = stats or {'pages': 0, 'rows': 0, 'bytes': 0}
+        for _ in range(MAX_EVENTS_PER_POLL):
+            try:
+                event = self.events.get_nowait()
+            except queue.Empty:
+                break
+
+            if event['type'] == 'done':
+                self.cleanup_progress(progress_window)
+                if event.get('failed'):
+                    messagebox.showerror(event['title'], event['message'])
+                else:
+                    messagebox.showinfo(event['title'], event['message'])
+                return
+
+            if event['type'] == 'page_fetched':
+                stats['pages'] += 1
+                stats['rows'] += event['rows']
+                stats['bytes'] += event['bytes']
+                progress_window.title(f"Please Wait... {stats['pages']} pages, {stats['rows']} rows, "
+                                      f"{stats['bytes'] // 1024} KB")
+                continue
+
+            message = format_event(event)
+            if message:
+                self.update_progress(progress_text, progress, f'\n{message}\n', event.get('progress'))
+
+        self.root.after(POLL_MS, self.process_events, progress_window, progress_text, progress, stats)
+
+    def start_worker(self, target, args, title="Please Wait..."):
+        self.root.attributes('-disabled', True)
+        progress_window, progress_text, progress = self.create_progress_window(title)
+
+        threading.Thread(target=target, args=args, daemon=True).start()
+        self.root.after(POLL_MS, self.process_events, progress_window, progress_text, progress)
+
+    def cleanup_progress(self, progress_window):
+        self.root.attributes('-disabled', False)
+        if progress_window.winfo_exists():
+            progress_window.destroy()
+
+    def generate_sheets_thread(self, tracker_names, final=False, incremental=False):
+        try:
+            report = self.engine.generate(tracker_names, final=final, incremental=incremental,
+                                          on_event=self.events.put)
+
+            # Collect problems into one end-of-run report
+            lines = ["Sheets generated successfully."] if report['contests'] else ["No sheets were generated."]
+            if report['errors']:
+                lines.append("\nErrors:")
+                lines += [f"- Failed to fetch data for {name}: {error}" for name, error in report['errors'].items()]
+            if report['warnings']:
+                lines.append("\nWarnings:")
+                lines += [f"- {warning}" for warning in report['warnings']]
+            title = "Success" if report['contests'] and not report['errors'] else "Finished with problems"
+            self.events.put({'type': 'done', 'title': title, 'message': '\n'.join(lines)})
+
+        except Exception as e:
+            self.events.put({'type': 'done', 'title': "Error", 'message': f"An error occurred: {str(e)}",
+                             'failed': True})
+
+    def create_watch_window(self, contests, stop, save):
+        watch_window = tk.Toplevel(self.root)
+        try:
+            watch_window.iconbitmap('venv/logo.ico')
+        except:
+            pass
+        watch_window.title("Live Leaderboard")
+        watch_window.geometry("1000x600")
+        watch_window['background'] = '#404445'
+        watch_window.protocol("WM_DELETE_WINDOW", stop)
+
+        status = tk.Label(watch_window, text="Fetching contests...", anchor="w", fg="#FFE33E", bg='#404445',
+                          font=tkFont.Font(family='Times', size=16, weight='bold'))
+        status.pack(fill=tk.X, padx=10, pady=5)
+
+        # Configure the standings table, one row per participant in rank order
+        columns = ['Rank', 'Name', *contests, 'Total Score']
+        frame = tk.Frame(watch_window, bg='#404445')
+        frame.pack(fill=tk.BOTH, expand=True, padx=10)
+        tree = ttk.Treeview(frame, columns=[str(i) for i in range(len(columns))], show='headings')
+        for i, column in enumerate(columns):
+            tree.heading(str(i), text=column)
+            tree.column(str(i), width=200 if column == 'Name' else 90, anchor='w' if column == 'Name' else 'e')
+        scrollbar = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        buttons = tk.Frame(watch_window, bg='#404445')
+        buttons.pack(pady=10)
+        save_btn = tk.Button(buttons, text="Save Excel Sheets", command=save, background="#006400", fg="#FFE33E",
+                             font=tkFont.Font(family='Times', size=16, weight='bold'))
+        save_btn.pack(side=tk.LEFT, padx=10)
+        stop_btn = tk.Button(buttons, text="Stop and Save", command=stop, background="maroon", fg="#FFE33E",
+                             font=tkFont.Font(family='Times', size=16, weight='bold'))
+        stop_btn.pack(side=tk.LEFT, padx=10)
+
+        return watch_window, tree, status, (save_btn, stop_btn)
+
+    def apply_standings(self, tree, rows, totals):
+        # Rows whose total changed are taken out and put back at their new
+        # place; the others stay where they are and only get their new rank
+        moved = []
+        for number, rank, *values in rows:
+            iid = str(number)
+            cells = [rank, *(f'{value:g}' if isinstance(value, float) else value for value in values)]
+            if iid not in totals:
+                tree.insert('', tk.END, iid=iid, values=cells)
+            else:
+                tree.item(iid, values=cells)
+            if totals.get(iid) != values[-1]:
+                moved.append((rank, iid))
+            totals[iid] = values[-1]
+
+        for _, iid in moved:
+            tree.detach(iid)
+        for rank, iid in sorted(moved):
+            tree.move(iid, '', rank - 1)
+
+    def process_watch_events(self, watch_window, tree, status, buttons, totals):
+        # Like process_events, for the live leaderboard window
+        for _ in range(MAX_EVENTS_PER_POLL):
+            try:
+                event = self.events.get_nowait()
+            except queue.Empty:
+                break
+
+            if event['type'] == 'done':
+                self.cleanup_progress(watch_window)
+                if event.get('failed'):
+                    messagebox.showerror(event['title'], event['message'])
+                else:
+                    messagebox.showinfo(event['title'], event['message'])
+                return
+
+            if event['type'] == 'standings':
+                self.apply_standings(tree, event['rows'], totals)
+                status.config(text=format_event(event))
+            elif event['type'] == 'saved':
+                buttons[0].config(state=tk.NORMAL)
+                status.config(text=event['message'])
+            elif event['type'] == 'stopping':
+                for button in buttons:
+                    button.config(state=tk.DISABLED)
+                status.config(text="Stopping after this update, then saving...")
+
+        self.root.after(POLL_MS, self.process_watch_events, watch_window, tree, status, buttons, totals)
+
+    def watch_thread(self, watch, stop):
+        try:
+            watch.run(WATCH_INTERVAL, stop, on_event=self.events.put)
+            files = watch.write()
+            self.events.put({'type': 'done', 'title': "Success",
+                             'message': "Leaderboards saved:\n" + '\n'.join(files)})
+
+        except Exception as e:
+            self.events.put({'type': 'done', 'title': "Error", 'message': f"An error occurred: {str(e)}",
+                             'failed': True})
+
+    def save_watch_thread(self, watch):
+        try:
+            files = watch.write()
+            self.events.put({'type': 'saved', 'message': f"Saved {', '.join(Path(f).name for f in files)}"})
+        except Exception as e:
+            self.events.put({'type': 'saved', 'message': f"Saving failed: {str(e)}"})
+
+    def start_watch(self, contest_ids):
+        # The watch thread polls the contests and queues the changes; Save
+        # writes the workbooks on another thread so updates keep coming
+        self.root.attributes('-disabled', True)
+        watch = LeaderboardWatch(self.engine, contest_ids)
+        stop = threading.Event()
+
+        def on_stop():
+            stop.set()
+            self.events.put({'type': 'stopping'})
+
+        def on_save():
+            buttons[0].config(state=tk.DISABLED)
+            threading.Thread(target=self.save_watch_thread, args=(watch,), daemon=True).start()
+
+        watch_window, tree, status, buttons = self.create_watch_window(watch.contests, on_stop, on_save)
+        threading.Thread(target=self.watch_thread, args=(watch, stop), daemon=True).start()
+        self.root.after(POLL_MS, self.process_watch_events, watch_window, tree, status, buttons, {})
+
+    def generate_sheets_command(self):
+        inp = self.entry.get(1.0, 'end-1c').strip()
+        default_text = '   Enter Comma Separated values of HACKERRANK_CONTEST_ID\'s'
+
+        if inp == default_text or not inp:
+            messagebox.showerror('Error', 'Please enter contest IDs!')
+            return
+
+        try:
+            contest_ids = [id.strip() for id in inp.split(',') if id.strip()]
+            if not contest_ids:
+                messagebox.showerror('Error', 'No valid contest IDs entered!')
+                return
+
+            if self.watch_var.get():
+                self.start_watch(contest_ids)
+                return
+
+            self.start_worker(
+                self.generate_sheets_thread,
+                (contest_ids, self.final_var.get(), self.incremental_var.get())
+            )
+
+        except Exception as e:
+            messagebox.showerror('Error', f'An error occurred: {str(e)}')
+            self.root.attributes('-disabled', False)
+
+    @staticmethod
+    def fuzzy_summary(summary):
+        if 'students_matched_fuzzy' not in summary:
+            return ""
+        return (f"\n- Matched by alias: {summary['students_matched_by_alias']}"
+                f"\n- Matched fuzzily: {summary['students_matched_fuzzy']} (check the Match column)")
+
+    def combine_sheets_thread(self, student_files, hackerrank_file, match_threshold=None):
+        try:
+            summary = self.engine.combine(student_files, hackerrank_file, on_event=self.events.put,
+                                          match_threshold=match_threshold)
+
+            self.events.put({'type': 'done', 'title': "Success", 'message':
+                             f"Excel sheets generated successfully!\n\n"
+                             f"Matched Entries Sheet:\n"
+                             f"- Students with scores: {summary['students_with_scores']}\n"
+                             f"- Students without participation: {summary['students_without_scores']}"
+                             f"{self.fuzzy_summary(summary)}\n\n"
+                             f"Unmatched Entries Sheet:\n"
+                             f"- Unmatched Hackerrank users: {summary['unmatched_hackerrank_users']}\n\n"
+                             f"Check both sheets in CombinedLeaderboard.xlsx"})
+
+        except Exception as e:
+            self.events.put({'type': 'done', 'title': "Error", 'message': f"An error occurred: {str(e)}",
+                             'failed': True})
+
+    def combine_batches_thread(self, student_files, hackerrank_file, match_threshold=None):
+        try:
+            result = self.engine.combine_batches(student_files, hackerrank_file, on_event=self.events.put,
+                                                 match_threshold=match_threshold)
+
+            lines = ["Excel sheets generated successfully!\n"]
+            for batch in result['batches']:
+                lines.append(f"{Path(batch['file']).name}:\n"
+                             f"- Students with scores: {batch['students_with_scores']}\n"
+                             f"- Students without participation: {batch['students_without_scores']}"
+                             f"{self.fuzzy_summary(batch)}")
+            lines.append(f"\nUnmatched Hackerrank users across all files: {result['unmatched_hackerrank_users']}\n"
+                         f"(see UnmatchedHackerrankUsers.xlsx)")
+            self.events.put({'type': 'done', 'title': "Success", 'message': '\n'.join(lines)})
+
+        except Exception as e:
+            self.events.put({'type': 'done', 'title': "Error", 'message': f"An error occurred: {str(e)}",
+                             'failed': True})
+
+    def combine_excel_sheets(self):
+        # Show instruction message box
+        messagebox.showinfo(
+            "Instructions",
+            "Please follow these steps:\n\n"
+            "1. First, upload the Student Batch Excel sheet\n"
+            "   (containing Roll Numbers and Hackerrank IDs;\n"
+            "   several files, CSV or Parquet work too)\n\n"
+            "2. Then, upload the TotalHackerrankLeaderBoard.xlsx file\n"
+            "   (generated from the previous step)"
+        )
+
+        try:
+            student_files = filedialog.askopenfilenames(
+                title='Select Student Data Excel Files',
+                filetypes=[('Student Batches', '*.xlsx *.csv *.parquet'), ('Excel Files', '*.xlsx')],
+                initialdir=self.engine.output_dir
+            )
+            if not student_files:
+                return
+
+            hackerrank_file = filedialog.askopenfilename(
+                title='Select Hackerrank Leaderboard Excel File',
+                filetypes=[('Excel Files', '*.xlsx')],
+                initialdir=self.engine.output_dir
+            )
+            if not hackerrank_file:
+                return
+
+            # Several rosters can be one batch, or one section each
+            batch = len(student_files) > 1 and messagebox.askyesno(
+                "Combine",
+                f"{len(student_files)} student files selected.\n\n"
+                "Yes: write a separate combined sheet for each file (one per section)\n"
+                "No: combine them into a single batch"
+            )
+            self.start_worker(
+                self.combine_batches_thread if batch else self.combine_sheets_thread,
+                (list(student_files), hackerrank_file, FUZZY_THRESHOLD if self.fuzzy_var.get() else None),
+                "Combining Excel Sheets..."
+            )
+
+        except Exception as e:
+            messagebox.showerror("Error", f"An error occurred: {str(e)}")
+            self.root.attributes('-disabled', False)
+
+    def on_entry_click(self, event):
+        if self.entry.get("1.0", 'end-1c').strip() == 'Enter Comma Separated values of HACKERRANK_CONTEST_ID\'s':
+            self.entry.delete('1.0', tk.END)
+
+    def on_closing(self):
+        self.root.destroy()
+
+    def run(self):
+        self.root.mainloop()
+
@@ -0,0 +1,92 @@
+import sys
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+import requests
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / 'benchmarks'))
+from engine import MAX_PAGE_SIZE, LeaderboardEngine  # noqa: E402
+from mock_api import LeaderboardHandler, MockLeaderboardServer  # noqa: E402
+
+CONTESTS = ['contest-a', 'contest-b', 'contest-c']
+PARTICIPANTS = 2500
+
+
+def sequential_fetch(base_url, contest, limit=MAX_PAGE_SIZE):
+    # The plain offset loop: one page after the other until an empty page
+    rows = []
+    offset = 0
+    while True:
+        response = requests.get(f'{base_url}/rest/contests/{contest}/leaderboard?offset={offset}&limit={limit}')
+        response.raise_for_status()
+        models = response.json()['models']
+        if not models:
+            return rows
+        rows.extend((model['hacker'], model['score']) for model in models)
+        offset += len(models)
+
+
+def fetched_rows(df):
+    return list(zip(df['Name'], df['Score']))
+
+
+def engine(server, output_dir, max_workers=8, use_cache=False):
+    app = LeaderboardEngine(output_dir, base_url=server.url, max_workers=max_workers, use_cache=use_cache,
+                            use_store=False)
+    app.client.rate_limit = 1000
+    return app
+
+
+class BrokenHandler(LeaderboardHandler):
+    # contest-b answers its first page, then 404s for every later one
+    def do_GET(self):
+        url = urlsplit(self.path)
+        offset = int(parse_qs(url.query).get('offset', ['0'])[0])
+        if '/contest-b/' in url.path and offset > 0:
+            self.server.count_request()
+            return self.send_body(404)
+        return super().do_GET()
+
+
+@pytest.mark.parametrize('max_limit', [MAX_PAGE_SIZE, 250])
+@pytest.mark.parametrize('max_workers', [1, 8])
+def test_fetch_contests_equals_sequential_fetch(tmp_path, max_limit, max_workers):
+    with MockLeaderboardServer(participants=PARTICIPANTS, max_limit=max_limit) as server:
+        results, errors = engine(server, tmp_path, max_workers).fetch_contests(CONTESTS)
+
+        assert errors == {}
+        assert sorted(results) == CONTESTS
+        for contest in CONTESTS:
+            expected = sequential_fetch(server.url, contest)
+            assert len(expected) == PARTICIPANTS
+            assert fetched_rows(results[contest]) == expected
+
+
+def test_fetch_contests_from_cache(tmp_path):
+    with MockLeaderboardServer(participants=PARTICIPANTS, max_limit=250) as server:
+        engine(server, tmp_path, use_cache=True).fetch_contests(CONTESTS)
+        server.reset()
+        results, errors = engine(server, tmp_path, use_cache=True).fetch_contests(CONTESTS)
+
+        assert errors == {}
+        assert server.requests == 0
+        for contest in CONTESTS:
+            assert fetched_rows(results[contest]) == sequential_fetch(server.url, contest)
+
+
+def test_contest_failing_mid_stream(tmp_path):
+    with MockLeaderboardServer(participants=PARTICIPANTS) as server:
+        server.RequestHandlerClass = BrokenHandler
+        fetched = []
+        results, errors = engine(server, tmp_path).fetch_contests(
+            CONTESTS, on_contest_fetched=lambda name, df, done, total: fetched.append(name))
+
+        assert list(errors) == ['contest-b']
+        assert isinstance(errors['contest-b'], requests.HTTPError)
+        assert results['contest-b'] is None
+        assert sorted(fetched) == sorted(CONTESTS)
+        for contest in ['contest-a', 'contest-c']:
+            assert fetched_rows(results[contest]) == sequential_fetch(server.url, contest)
@@ -0,0 +1,76 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / 'benchmarks'))
+from engine import LeaderboardEngine  # noqa: E402
+from mock_api import MockLeaderboardServer  # noqa: E402
+
+CONTESTS = ['contest-a', 'contest-b']
+
+
+@pytest.fixture
+def server():
+    with MockLeaderboardServer(participants=1500) as server:
+        yield server
+
+
+def engine(server, output_dir):
+    app = LeaderboardEngine(output_dir, base_url=server.url, max_workers=4, render_workers=1)
+    app.client.rate_limit = 1000
+    return app
+
+
+def expire(app):
+    # Age the stored contests and their cached pages past the TTL
+    app.store.conn.execute('UPDATE contests SET fetched_at = 0')
+    app.store.conn.commit()
+    app.cache.conn.execute('UPDATE pages SET expires_at = 0')
+    app.cache.conn.commit()
+
+
+def test_final_run_refetches_stale_contests(tmp_path, server):
+    report = engine(server, tmp_path).generate(CONTESTS, incremental=True)
+    assert report['contests'] == CONTESTS
+
+    app = engine(server, tmp_path)
+    expire(app)
+    server.contests['contest-a'] = [dict(row, score=7.0) for row in server.contest('contest-a')]
+    server.reset()
+    report = app.generate(CONTESTS, final=True, incremental=True)
+
+    assert server.requests > 0
+    assert report['contests'] == CONTESTS
+    sheet = pd.read_excel(tmp_path / 'ContestLeaderboards.xlsx', sheet_name='contest-a')
+    assert (sheet['Score'] == 7.0).all()
+    total = pd.read_excel(tmp_path / 'TotalHackerrankLeaderBoard.xlsx')
+    assert (total['contest-a'] == 7.0).sum() == len(sheet)
+    assert all(app.cache.is_final(name) for name in CONTESTS)
+
+
+def test_final_contests_stay_fresh(tmp_path, server):
+    engine(server, tmp_path).generate(CONTESTS, final=True, incremental=True)
+
+    app = engine(server, tmp_path)
+    expire(app)
+    server.reset()
+    report = app.generate(CONTESTS, incremental=True)
+
+    assert server.requests == 0
+    assert report['contests'] == CONTESTS
+
+
+@pytest.mark.parametrize('incremental, render_workers', [(False, 1), (True, 1), (True, 2), (False, 2)])
+def test_bytes_written_counts_output_files(tmp_path, server, monkeypatch, incremental, render_workers):
+    monkeypatch.setattr('engine.PARALLEL_RENDER_ROWS', 0)
+    app = engine(server, tmp_path)
+    app.render_workers = render_workers
+    report = app.generate(CONTESTS, incremental=incremental)
+
+    outputs = [Path(name) for name in report['files']]
+    outputs += [path.with_suffix('.feather') for path in outputs if path.with_suffix('.feather').exists()]
+    assert app.metrics.counters['bytes_written'] == sum(path.stat().st_size for path in outputs)
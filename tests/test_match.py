@@ -0,0 +1,166 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from engine import FUZZY_THRESHOLD, HandleIndex, LeaderboardEngine  # noqa: E402
+
+
+def row_scan(student_df, hackerrank_df):
+    # The matching combine_sheets_thread did before the join: a leaderboard scan per student
+    student_df = student_df[['Roll number', 'Hackerrank']].copy()
+    student_df['Hackerrank'] = student_df['Hackerrank'].str.strip().str.lstrip('@').str.lower()
+    hackerrank_df = hackerrank_df.drop(columns=[col for col in ['Rank', 'Total Score']
+                                                if col in hackerrank_df.columns])
+    student_df['Hackerrank'] = student_df['Hackerrank'].str.strip()
+    hackerrank_df['Name'] = hackerrank_df['Name'].str.strip()
+    hackerrank_df['Name_lower'] = hackerrank_df['Name'].str.lower()
+    score_columns = [col for col in hackerrank_df.columns if col not in ['Name', 'Name_lower', 'Rank', 'Total Score']]
+
+    matched_df = student_df.copy()
+    matched_df['Name'] = ''
+    for col in score_columns:
+        matched_df[col] = 0
+    for idx, student in matched_df.iterrows():
+        match = hackerrank_df[hackerrank_df['Name_lower'] == student['Hackerrank']]
+        if not match.empty:
+            matched_df.at[idx, 'Name'] = match.iloc[0]['Name']
+            for col in score_columns:
+                matched_df.at[idx, col] = match.iloc[0][col]
+    matched_df['Total Score'] = matched_df[score_columns].sum(axis=1)
+    matched_df = matched_df.sort_values('Total Score', ascending=False)
+    matched_df.insert(0, 'Rank', range(1, len(matched_df) + 1))
+
+    matched_usernames = matched_df[matched_df['Name'] != '']['Name'].str.lower()
+    unmatched_df = hackerrank_df[~hackerrank_df['Name_lower'].isin(matched_usernames)].drop('Name_lower', axis=1)
+    unmatched_df['Roll number'] = ''
+    unmatched_df['Total Score'] = unmatched_df[score_columns].sum(axis=1)
+    unmatched_df = unmatched_df.sort_values('Total Score', ascending=False)
+    unmatched_df.insert(0, 'Rank', range(1, len(unmatched_df) + 1))
+
+    final_cols = ['Rank', 'Roll number', 'Name'] + score_columns + ['Total Score']
+    return matched_df[final_cols], unmatched_df[final_cols]
+
+
+@pytest.fixture
+def leaderboard():
+    # 'Alice' and 'alice' are the same handle listed twice; the first row is the higher ranked one
+    rng = np.random.default_rng(6)
+    names = ['Alice', 'Bob', ' Carol ', 'dave', 'alice', 'Eve_01', 'frank'] + [f'hacker_{i}' for i in range(40)]
+    df = pd.DataFrame({'Name': names})
+    df['contest-a'] = rng.integers(0, 100, len(df)).astype(float)
+    df['contest-b'] = rng.integers(0, 100, len(df)).astype(float)
+    df['Total Score'] = df[['contest-a', 'contest-b']].sum(axis=1)
+    df = df.sort_values('Total Score', ascending=False, kind='stable')
+    df.insert(0, 'Rank', range(1, len(df) + 1))
+    return df
+
+
+@pytest.fixture
+def roster():
+    handles = ['ALICE', '@bob', ' Carol ', None, 'bob', 'nobody', '@ Dave', 'eve_01', '', 'HACKER_3', 'hacker_3']
+    return pd.DataFrame({'Roll number': [f'R{i:03d}' for i in range(len(handles))], 'Hackerrank': handles})
+
+
+def write_leaderboard(app, df, filepath):
+    app.write_excel_file(filepath, [('Sheet1', df)])
+    return filepath
+
+
+def test_match_roster_equals_row_scan(tmp_path, leaderboard, roster):
+    app = LeaderboardEngine(tmp_path, use_cache=False, use_store=False)
+    filepath = write_leaderboard(app, leaderboard, tmp_path / 'TotalHackerrankLeaderBoard.xlsx')
+
+    student_df = roster.copy()
+    student_df['Hackerrank'] = app.normalize_handles(student_df['Hackerrank'])
+    matched_df, unmatched_df = app.match_roster(student_df, app.index_leaderboard(filepath))
+    expected_matched, expected_unmatched = row_scan(roster, pd.read_excel(filepath))
+
+    pd.testing.assert_frame_equal(matched_df.reset_index(drop=True), expected_matched.reset_index(drop=True),
+                                  check_dtype=False)
+    pd.testing.assert_frame_equal(unmatched_df.reset_index(drop=True), expected_unmatched.reset_index(drop=True),
+                                  check_dtype=False)
+    # Both Alice rows are claimed, and the higher ranked one supplies the scores
+    assert 'alice' not in set(unmatched_df['Name'].str.lower())
+    alice = leaderboard[leaderboard['Name'].str.lower() == 'alice'].iloc[0]
+    assert matched_df.loc[matched_df['Roll number'] == 'R000', 'Total Score'].item() == alice['Total Score']
+
+
+def test_combine_writes_row_scan_sheets(tmp_path, leaderboard, roster):
+    app = LeaderboardEngine(tmp_path, use_cache=False, use_store=False)
+    filepath = write_leaderboard(app, leaderboard, tmp_path / 'TotalHackerrankLeaderBoard.xlsx')
+    roster_file = tmp_path / 'students.csv'
+    roster.to_csv(roster_file, index=False)
+
+    summary = app.combine(roster_file, filepath)
+    expected_matched, expected_unmatched = row_scan(roster, pd.read_excel(filepath))
+
+    assert summary['students_with_scores'] == (expected_matched['Name'] != '').sum()
+    assert summary['students_without_scores'] == (expected_matched['Name'] == '').sum()
+    assert summary['unmatched_hackerrank_users'] == len(expected_unmatched)
+    for sheet_name, expected in [('Matched Entries', expected_matched), ('Unmatched Entries', expected_unmatched)]:
+        written = pd.read_excel(summary['file'], sheet_name=sheet_name)
+        expected = pd.read_excel(write_leaderboard(app, expected, tmp_path / 'expected.xlsx'))
+        pd.testing.assert_frame_equal(written, expected, check_dtype=False)
+
+
+@pytest.fixture
+def fuzzy_files(tmp_path):
+    # Typo'd, numbered and ambiguous handles next to one exact match
+    app = LeaderboardEngine(tmp_path, use_cache=False, use_store=False)
+    names = ['priyanka_sharma', 'cse21_046', 'johnsmith', 'johnsmyth', 'ravi.k']
+    df = pd.DataFrame({'Name': names, 'contest-a': [50.0, 40.0, 30.0, 20.0, 10.0]})
+    df['Total Score'] = df['contest-a']
+    df.insert(0, 'Rank', range(1, len(df) + 1))
+    filepath = write_leaderboard(app, df, tmp_path / 'TotalHackerrankLeaderBoard.xlsx')
+    roster_file = tmp_path / 'students.csv'
+    pd.DataFrame({'Roll number': ['R001', 'R002', 'R003', 'R004'],
+                  'Hackerrank': ['priyanka_shrma', 'cse21_045', 'johnsmth', 'ravi.k']}).to_csv(roster_file, index=False)
+    return roster_file, filepath
+
+
+def matches(summary):
+    matched = pd.read_excel(summary['file'], sheet_name='Matched Entries', keep_default_na=False)
+    return dict(zip(matched['Roll number'], zip(matched['Name'], matched['Match'])))
+
+
+def test_handle_index_lookup():
+    index = HandleIndex(['priyanka_sharma', 'cse21_046', 'johnsmith', 'johnsmyth'])
+
+    (similarity, number), = index.lookup('Priyanka_Shrma', FUZZY_THRESHOLD)
+    assert index.handles[number] == 'priyanka_sharma' and similarity >= FUZZY_THRESHOLD
+    # Handles that differ only in their digits never match
+    assert index.lookup('cse21_045') == []
+    assert [index.handles[number] for _, number in index.lookup('johnsmth', FUZZY_THRESHOLD)] == [
+        'johnsmith', 'johnsmyth']
+
+
+def test_resolve_handles_fuzzy(tmp_path, fuzzy_files):
+    app = LeaderboardEngine(tmp_path, use_cache=False, use_store=False)
+    summary = app.combine(*fuzzy_files, match_threshold=FUZZY_THRESHOLD)
+    found = matches(summary)
+
+    name, how = found['R001']
+    assert name == 'priyanka_sharma' and how.startswith('fuzzy (')
+    # A different number is a different student
+    assert found['R002'] == ('', '')
+    # Two equally close handles are left for a person to pick from
+    assert found['R003'] == ('', '')
+    assert found['R004'] == ('ravi.k', 'exact')
+    assert summary['students_matched_fuzzy'] == 1
+    assert summary['students_matched_by_alias'] == 0
+
+
+def test_fuzzy_matches_are_not_remembered(tmp_path, fuzzy_files):
+    first = matches(LeaderboardEngine(tmp_path, use_cache=False, use_store=False).combine(
+        *fuzzy_files, match_threshold=FUZZY_THRESHOLD))
+    app = LeaderboardEngine(tmp_path, use_cache=False, use_store=False)
+    summary = app.combine(*fuzzy_files, match_threshold=FUZZY_THRESHOLD)
+
+    assert matches(summary) == first
+    assert summary['students_matched_by_alias'] == 0
+    assert app.alias_table().lookup(['R001']) == {}
+    assert app.alias_table().lookup(['R004']) == {'R004': ['ravi.k']}